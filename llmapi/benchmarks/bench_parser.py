@@ -0,0 +1,122 @@
+"""Compare the single-pass parser with the original regex parsers.
+
+Run from the llmapi directory:
+
+    python -m benchmarks.bench_parser
+"""
+import re
+import time
+from parsers import parse_questions
+
+
+# ---------------------------------------------------------
+# ORIGINAL REGEX PARSERS (baseline)
+# ---------------------------------------------------------
+
+def regex_parse_mcqs(text: str):
+    pattern = re.compile(
+        r"(?P<question>\d+\.\s+.*?\?)\s*"
+        r"a\)\s*(?P<a>.*?)\s*"
+        r"b\)\s*(?P<b>.*?)\s*"
+        r"c\)\s*(?P<c>.*?)\s*"
+        r"d\)\s*(?P<d>.*?)\s*"
+        r"(?:Correct Answer|Correct answer)[:\s]+(?P<correct>[abcdABCD])",
+        re.DOTALL
+    )
+    return [m.group("question") for m in pattern.finditer(text)]
+
+
+def regex_parse_shorts(text: str):
+    match = re.search(r"(6\..*)", text, re.DOTALL)
+    if not match:
+        return []
+    pattern = re.compile(
+        r"(?P<q_num>[6-9]|10)\.\s*(?P<question>.*?)\s*\(Sample answer:\s*(?P<answer>.*?)\)",
+        re.DOTALL | re.IGNORECASE
+    )
+    return [m.group("question") for m in pattern.finditer(match.group(1))]
+
+
+# ---------------------------------------------------------
+# CORPUS
+# ---------------------------------------------------------
+
+def mcq(n, style="plain"):
+    q = f"{n}. Which process converts light energy into chemical energy in plants?"
+    opts = ["Respiration", "Photosynthesis", "Transpiration", "Digestion"]
+    if style == "bold":
+        q = f"**{q}**"
+    if style == "inline":
+        return f"{q}\na) {opts[0]} b) {opts[1]} c) {opts[2]} d) {opts[3]}\nCorrect answer: b\n"
+    lines = [q] + [f"{letter}) {opt}" for letter, opt in zip("abcd", opts)]
+    return "\n".join(lines) + "\nCorrect answer: b\n"
+
+
+def short(n, style="plain"):
+    q = f"{n}. Explain the role of chlorophyll in photosynthesis."
+    answer = "Chlorophyll absorbs light (mostly red and blue) and starts the light reactions."
+    if style == "nextline":
+        return f"{q}\n(Sample answer: {answer})\n"
+    return f"{q} (Sample answer: {answer})\n"
+
+
+def typical():
+    return (
+        "Here are the questions based on the document:\n\n**Multiple Choice Questions**\n\n"
+        + "\n".join(mcq(i) for i in range(1, 6))
+        + "\n**Short Questions**\n\n"
+        + "\n".join(short(i, "nextline") for i in range(6, 11))
+    )
+
+
+def build_corpus():
+    corpus = {
+        "typical (5+5)": typical(),
+        "markdown bold": "\n".join(mcq(i, "bold") for i in range(1, 6)) + "\n" + "\n".join(short(i) for i in range(6, 11)),
+        "inline options": "\n".join(mcq(i, "inline") for i in range(1, 6)) + "\n" + "\n".join(short(i) for i in range(6, 11)),
+        "50 + 50 questions": "\n".join(mcq(i) for i in range(1, 51)) + "\n" + "\n".join(short(i) for i in range(51, 101)),
+        "short numbering 11-15": "\n".join(mcq(i) for i in range(1, 6)) + "\n" + "\n".join(short(i) for i in range(11, 16)),
+    }
+    # Adversarial: output cut off before any "Correct answer" line. The regex
+    # backtracking grows exponentially with the number of questions (20 already
+    # takes tens of seconds), so keep the sizes small.
+    for n in (6, 10, 12):
+        corpus[f"no answers, {n} questions"] = "\n".join(
+            f"{i}. Is this question number {i}?\na) x\nb) y\nc) z\nd) w" for i in range(1, n + 1)
+        )
+    # Adversarial: an unclosed sample answer followed by a lot of text (quadratic)
+    for n in (500, 2000):
+        corpus[f"unclosed sample, {n} lines"] = (
+            "6. Define energy. (Sample answer: the capacity to do work\n" + ("filler text 6. " * n)
+        )
+    return corpus
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+
+def timed(func, text, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - started)
+        if best > 0.5:
+            break  # slow enough that one run tells the story
+    return best * 1000, result
+
+
+def main(repeat: int = 5):
+    print(f"{'case':<30}{'chars':>8}{'regex ms':>11}{'regex found':>13}{'new ms':>9}{'new found':>11}{'errors':>8}")
+    for name, text in build_corpus().items():
+        old_ms, old = timed(lambda t: (regex_parse_mcqs(t), regex_parse_shorts(t)), text, repeat)
+        new_ms, new = timed(parse_questions, text, repeat)
+        old_found = len(old[0]) + len(old[1])
+        new_found = len(new["mcqs"]) + len(new["shorts"])
+        print(f"{name:<30}{len(text):>8}{old_ms:>11.2f}{old_found:>13}{new_ms:>9.2f}{new_found:>11}{len(new['errors']):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Per-document write time: original two-commit ORM path vs save_question_set.
+
+Run from the llmapi directory:
+
+    python -m benchmarks.bench_persistence
+"""
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models import QnaBase, Question, save_question_set
+
+
+def make_questions(count: int):
+    mcqs = [{
+        "type": "mcq",
+        "question": f"{i}. Which statement about topic {i} is correct?",
+        "choices": {"a": "First option", "b": "Second option", "c": "Third option", "d": "Fourth option"},
+        "correct_option": "b",
+    } for i in range(count // 2)]
+    shorts = [{
+        "type": "short",
+        "question": f"Explain concept {i} in your own words.",
+        "answer": "A two sentence model answer. It covers the key idea.",
+    } for i in range(count - count // 2)]
+    return mcqs, shorts
+
+
+def save_orm(db, text, generated, mcqs, shorts):
+    # The original generate_questions path: commit + refresh, add one by one, commit
+    db_entry = QnaBase(original_text=text, generated_output=generated)
+    db.add(db_entry)
+    db.commit()
+    db.refresh(db_entry)
+    for q in mcqs:
+        db.add(Question(
+            qna_id=db_entry.id, question_type="mcq", question_text=q["question"],
+            option1=q["choices"]["a"], option2=q["choices"]["b"],
+            option3=q["choices"]["c"], option4=q["choices"]["d"],
+            correct_option=q["correct_option"],
+        ))
+    for q in shorts:
+        db.add(Question(qna_id=db_entry.id, question_type="short", question_text=q["question"], answer_text=q["answer"]))
+    db.commit()
+    return db_entry.id
+
+
+def measure(save, session_factory, count: int, repeat: int) -> float:
+    mcqs, shorts = make_questions(count)
+    text = "source text " * 500
+    generated = "model output " * 200
+    timings = []
+    for _ in range(repeat):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            save(db, text, generated, mcqs, shorts)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    return statistics.median(timings)
+
+
+def main(repeat: int = 7):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+        print(f"{'questions':>10}{'orm ms':>10}{'bulk ms':>10}{'speedup':>9}")
+        for count in (10, 100, 1000):
+            orm_ms = measure(save_orm, session_factory, count, repeat)
+            bulk_ms = measure(save_question_set, session_factory, count, repeat)
+            print(f"{count:>10}{orm_ms:>10.2f}{bulk_ms:>10.2f}{orm_ms / bulk_ms:>8.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
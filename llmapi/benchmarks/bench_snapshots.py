@@ -0,0 +1,67 @@
+"""CPU per question-set read: ORM rows + serialization vs stored snapshot bytes.
+
+Run from the llmapi directory:
+
+    python -m benchmarks.bench_snapshots
+
+Both paths hit SQLite (the in-process LRU is bypassed) so the numbers show
+what each cache miss costs; the snapshot path is also what every LRU fill
+and batch fetch now pays.
+"""
+import json
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models import Question, save_question_set, SNAPSHOT_QUERY
+from serialization import serialize_question, orjson
+from benchmarks.bench_persistence import make_questions
+
+
+def read_orm(db, qna_id: int) -> bytes:
+    # The original get_questions: materialize ORM rows, build dicts, encode
+    questions = db.query(Question).filter(Question.qna_id == qna_id).all()
+    return json.dumps([serialize_question(q) for q in questions]).encode("utf-8")
+
+
+def read_snapshot(db, qna_id: int) -> bytes:
+    return bytes(db.execute(SNAPSHOT_QUERY, {"id": qna_id}).first().questions_json)
+
+
+def cpu_per_request(read, db, ids) -> float:
+    started = time.process_time()
+    for qna_id in ids:
+        read(db, qna_id)
+    return (time.process_time() - started) / len(ids) * 1e6
+
+
+def main(sets: int = 500, questions: int = 10, requests: int = 5000):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+        db = session_factory()
+        mcqs, shorts = make_questions(questions)
+        qna_ids = [save_question_set(db, "text", "output", mcqs, shorts) for _ in range(sets)]
+        assert json.loads(read_orm(db, qna_ids[0])) == json.loads(read_snapshot(db, qna_ids[0]))
+
+        ids = [random.choice(qna_ids) for _ in range(requests)]
+        read_orm(db, ids[0]), read_snapshot(db, ids[0])  # warm up
+        orm_us = cpu_per_request(read_orm, db, ids)
+        snapshot_us = cpu_per_request(read_snapshot, db, ids)
+        db.close()
+        engine.dispose()
+
+    print(f"{sets} sets x {questions} questions, {requests} reads, encoder: {'orjson' if orjson else 'json'}")
+    print(f"{'path':<12}{'CPU us/req':>12}{'req/s/core':>12}")
+    for name, us in (("orm", orm_us), ("snapshot", snapshot_us)):
+        print(f"{name:<12}{us:>12.1f}{1e6 / us:>12.0f}")
+    print(f"CPU saved per request: {orm_us - snapshot_us:.1f} us ({orm_us / snapshot_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
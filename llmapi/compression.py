@@ -0,0 +1,130 @@
+import math
+import re
+import time
+from collections import Counter
+from documents import estimate_tokens, is_heading
+
+
+# ---------------------------------------------------------
+# EXTRACTIVE PROMPT COMPRESSION
+# ---------------------------------------------------------
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+SENTENCE_RE = re.compile(r"[^.!?]+(?:[.!?]+|$)")
+REDUNDANCY_THRESHOLD = 0.7
+TOC_LINE_RE = re.compile(r"(\.{3,}|…+|\s{2,})\s*\d+\s*$")
+TOC_HEADINGS = {"contents", "table of contents", "index"}
+REFERENCE_HEADINGS = {"references", "bibliography", "works cited", "further reading", "sources"}
+
+STOPWORDS = set("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves also may might must shall
+""".split())
+
+
+def _strip_boilerplate(lines: list) -> list:
+    """Drop table-of-contents lines, repeated headers and reference sections."""
+    counts = Counter(line.strip() for line in lines if line.strip())
+    kept = []
+    in_references = False
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.lower().rstrip(":") in TOC_HEADINGS:
+            continue
+        if stripped.lower().rstrip(":") in REFERENCE_HEADINGS:
+            in_references = True
+            continue
+        if in_references:
+            if is_heading(stripped):
+                in_references = False
+            else:
+                continue
+        if TOC_LINE_RE.search(stripped):
+            continue
+        if counts[stripped] >= 3 and len(stripped) < 120:
+            continue
+        kept.append(stripped)
+    return kept
+
+
+def _terms(sentence: str) -> list:
+    return [w for w in WORD_RE.findall(sentence.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def compress_text(text: str, max_tokens: int) -> tuple:
+    """Keep the most salient sentences of ``text`` within ``max_tokens``.
+
+    Sentences are scored by mean TF-IDF of their terms (each sentence is a
+    "document"), with a small boost for the first sentence of a paragraph and
+    for headings. The selected sentences are returned in their original order.
+    Returns ``(compressed_text, report)``.
+    """
+    started = time.perf_counter()
+    original_tokens = estimate_tokens(text)
+
+    sentences = []  # (paragraph index, sentence, is first in paragraph)
+    for p_index, paragraph in enumerate(_strip_boilerplate(text.split("\n"))):
+        if is_heading(paragraph):
+            sentences.append((p_index, paragraph, True))
+            continue
+        for s_index, match in enumerate(SENTENCE_RE.finditer(paragraph)):
+            sentence = match.group(0).strip()
+            if sentence:
+                sentences.append((p_index, sentence, s_index == 0))
+
+    term_lists = [_terms(s) for _, s, _ in sentences]
+    document_frequency = Counter(term for terms in term_lists for term in set(terms))
+    total = len(sentences) or 1
+
+    scores = []
+    for (_, sentence, first), terms in zip(sentences, term_lists):
+        if not terms:
+            scores.append(0.0)
+            continue
+        tf = Counter(terms)
+        weight = sum(count * math.log(total / document_frequency[term]) for term, count in tf.items())
+        score = weight / len(terms)
+        if first:
+            score *= 1.2
+        scores.append(score)
+
+    # Greedy pack by score, skipping near-duplicates, then restore document order
+    chosen = set()
+    chosen_terms = []
+    used = 0
+    for index in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        cost = estimate_tokens(sentences[index][1])
+        if used + cost > max_tokens:
+            continue
+        terms = set(term_lists[index])
+        if terms and any(len(terms & other) / len(terms | other) > REDUNDANCY_THRESHOLD for other in chosen_terms):
+            continue
+        chosen.add(index)
+        chosen_terms.append(terms)
+        used += cost
+
+    paragraphs = []
+    last_paragraph = None
+    for index in sorted(chosen):
+        p_index, sentence, _ = sentences[index]
+        if p_index != last_paragraph:
+            paragraphs.append([])
+            last_paragraph = p_index
+        paragraphs[-1].append(sentence)
+    compressed = "\n".join(" ".join(p) for p in paragraphs)
+
+    compressed_tokens = estimate_tokens(compressed)
+    report = {
+        "original_tokens": original_tokens,
+        "compressed_tokens": compressed_tokens,
+        "ratio": round(compressed_tokens / original_tokens, 3),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    return compressed, report
@@ -0,0 +1,93 @@
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+# ---------------------------------------------------------
+# SERVICE SETTINGS (override through environment / .env)
+# ---------------------------------------------------------
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+GENERATION_MODEL = os.getenv("GENERATION_MODEL", "llama3-8b-8192")
+EVALUATION_MODEL = os.getenv("EVALUATION_MODEL", "llama3-8b-8192")
+
+# Generation cache: entries older than the TTL are treated as misses,
+# and only the most recently used MAX_ENTRIES are kept (0 disables the limit).
+GENERATION_CACHE_ENABLED = os.getenv("GENERATION_CACHE_ENABLED", "1") == "1"
+GENERATION_CACHE_TTL_SECONDS = int(os.getenv("GENERATION_CACHE_TTL_SECONDS", str(180 * 24 * 3600)))
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "5000"))
+
+# Background generation jobs (POST /generate-questions/?job=true)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+# Queued/running jobs older than this were lost with a restarted worker and are reported as failed
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "1200"))
+
+# LLM calls: at most LLM_MAX_CONCURRENCY completions in flight per worker process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+# POST /evaluate-answers/batch
+EVAL_BATCH_MAX_ITEMS = int(os.getenv("EVAL_BATCH_MAX_ITEMS", "500"))
+EVAL_BATCH_CONCURRENCY = int(os.getenv("EVAL_BATCH_CONCURRENCY", "8"))
+
+# Evaluation cache: identical (question, expected, normalized student answer) reuse the grade
+EVALUATION_CACHE_ENABLED = os.getenv("EVALUATION_CACHE_ENABLED", "1") == "1"
+EVALUATION_CACHE_MAX_ENTRIES = int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "100000"))
+# Eviction runs every EVICT_EVERY new entries, so the table may briefly exceed MAX_ENTRIES by that many
+EVALUATION_CACHE_EVICT_EVERY = int(os.getenv("EVALUATION_CACHE_EVICT_EVERY", "500"))
+
+# Uploads larger than this are rejected with 413 before parsing
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+# Long documents are split into chunks of about this many tokens and generated in parallel;
+# the merged test keeps at most MAX_MCQS / MAX_SHORTS questions (0 keeps all)
+GENERATION_CHUNK_TOKENS = int(os.getenv("GENERATION_CHUNK_TOKENS", "5000"))
+GENERATION_MAX_MCQS = int(os.getenv("GENERATION_MAX_MCQS", "5"))
+GENERATION_MAX_SHORTS = int(os.getenv("GENERATION_MAX_SHORTS", "5"))
+
+# Optional extractive compression of the document before prompting
+PROMPT_COMPRESSION_ENABLED = os.getenv("PROMPT_COMPRESSION_ENABLED", "0") == "1"
+PROMPT_COMPRESSION_TOKENS = int(os.getenv("PROMPT_COMPRESSION_TOKENS", "3000"))
+
+# "text": free-form output read by parsers.py; "json": schema-validated JSON with repair retries
+GENERATION_OUTPUT_MODE = os.getenv("GENERATION_OUTPUT_MODE", "text")
+GENERATION_REPAIR_ATTEMPTS = int(os.getenv("GENERATION_REPAIR_ATTEMPTS", "2"))
+
+# Storage. SQLite gets WAL + the pragmas below; other URLs use the pool settings.
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./qnabase.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+
+# Serialized GET /questions/{qna_id} payloads kept in memory per worker
+QUESTION_CACHE_MAX_ENTRIES = int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "2048"))
+
+# GET /questions?ids=... and POST /questions/batch
+QUESTION_BATCH_MAX_IDS = int(os.getenv("QUESTION_BATCH_MAX_IDS", "1000"))
+QUESTION_BATCH_STREAM_THRESHOLD = int(os.getenv("QUESTION_BATCH_STREAM_THRESHOLD", "50"))
+
+# Token bucket for starting LLM calls (0 = no rate limit, only LLM_MAX_CONCURRENCY).
+# RATE_PER_MINUTE and BURST are for the whole service. Every uvicorn worker process
+# keeps its own bucket, so each gets 1/LLM_RATE_WORKERS of both. The worker count
+# defaults to uvicorn's WEB_CONCURRENCY; set it when passing --workers instead.
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "0"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_RATE_WORKERS = max(1, int(os.getenv("LLM_RATE_WORKERS", os.getenv("WEB_CONCURRENCY", "1"))))
+
+# Concurrent identical LLM requests (same model, messages, temperature) share one call
+LLM_COALESCE_ENABLED = os.getenv("LLM_COALESCE_ENABLED", "1") == "1"
+
+# "groq" calls the API; "stub" is a deterministic offline backend for load tests and benchmarks.
+# Stub latency is log-normal around LATENCY_MS (SIGMA 0 = constant); MALFORMED_RATE breaks that share of items.
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "800"))
+LLM_STUB_LATENCY_SIGMA = float(os.getenv("LLM_STUB_LATENCY_SIGMA", "0.4"))
+LLM_STUB_MALFORMED_RATE = float(os.getenv("LLM_STUB_MALFORMED_RATE", "0.05"))
+LLM_STUB_SEED = int(os.getenv("LLM_STUB_SEED", "0"))
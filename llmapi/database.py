@@ -0,0 +1,87 @@
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+import config
+from metrics import DB_QUERY_SECONDS, DB_SESSION_SECONDS
+
+# ---------------------------------------------------------
+# DB SETUP
+# ---------------------------------------------------------
+
+DATABASE_URL = config.DATABASE_URL
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+def _engine_options() -> dict:
+    # Every uvicorn worker is its own process with its own pool, so the
+    # pool only has to cover one worker's concurrency.
+    options = {}
+    if DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+        return {"connect_args": {"check_same_thread": False}}
+    options.update(
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+    )
+    if IS_SQLITE:
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options["pool_pre_ping"] = True
+        options["pool_recycle"] = config.DB_POOL_RECYCLE
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options())
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+Base = declarative_base()
+
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers in other workers run while one writer commits;
+        # busy_timeout makes concurrent writers wait instead of failing.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_BYTES}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+    if operation not in ("select", "insert", "update", "delete"):
+        operation = "other"
+    DB_QUERY_SECONDS.observe(elapsed, operation=operation)
+
+
+@event.listens_for(engine, "handle_error")
+def _query_failed(context):
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+
+# ---------------------------------------------------------
+# DB DEPENDENCY
+# ---------------------------------------------------------
+
+def get_db():
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        yield db
+    finally:
+        db.close()
+        DB_SESSION_SECONDS.observe(time.perf_counter() - started)
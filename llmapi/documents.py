@@ -0,0 +1,120 @@
+import io
+import re
+import docx
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+
+# ---------------------------------------------------------
+# DOCX TEXT EXTRACTION (in memory, no temp files)
+# ---------------------------------------------------------
+
+def _table_lines(table: Table):
+    for row in table.rows:
+        cells = []
+        seen = set()
+        for cell in row.cells:
+            # Merged cells show up once per grid column; keep the first
+            if id(cell._tc) in seen:
+                continue
+            seen.add(id(cell._tc))
+            text = " ".join(cell.text.split())
+            if text:
+                cells.append(text)
+        if cells:
+            yield " | ".join(cells)
+
+
+def extract_docx_text(contents: bytes) -> str:
+    """Return the text of a .docx upload: headers first, then body paragraphs and tables in order."""
+    doc = docx.Document(io.BytesIO(contents))
+    lines = []
+
+    seen_headers = set()
+    for section in doc.sections:
+        for header in (section.first_page_header, section.header, section.even_page_header):
+            if header.is_linked_to_previous:
+                continue
+            text = "\n".join(p.text for p in header.paragraphs if p.text.strip())
+            if text and text not in seen_headers:
+                seen_headers.add(text)
+                lines.append(text)
+
+    for child in doc.element.body.iterchildren():
+        if child.tag == qn("w:p"):
+            lines.append(Paragraph(child, doc).text)
+        elif child.tag == qn("w:tbl"):
+            lines.extend(_table_lines(Table(child, doc)))
+
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------
+# CHUNKING FOR LONG DOCUMENTS
+# ---------------------------------------------------------
+
+HEADING_RE = re.compile(r"^(chapter|section|unit|part|lesson)\b|^\d+(\.\d+)*\s+\S", re.IGNORECASE)
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose is close enough for budgeting
+    return len(text) // 4 + 1
+
+
+def is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > 80 or line.endswith((".", "?", "!", ":", ";", ",")):
+        return False
+    return bool(HEADING_RE.match(line)) or line.isupper() or line.istitle()
+
+
+def _split_long_paragraph(paragraph: str, max_tokens: int):
+    piece = []
+    size = 0
+    for sentence in SENTENCE_END_RE.split(paragraph):
+        tokens = estimate_tokens(sentence)
+        if piece and size + tokens > max_tokens:
+            yield " ".join(piece)
+            piece, size = [], 0
+        piece.append(sentence)
+        size += tokens
+    if piece:
+        yield " ".join(piece)
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list:
+    """Split text into sections of at most ``max_tokens`` (estimated).
+
+    Breaks fall on paragraph boundaries, preferably right before a heading
+    once a chunk is half full, so each chunk stays on one topic.
+    """
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks = []
+    current = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if any(line.strip() for line in current):
+            chunks.append("\n".join(current).strip())
+        current, size = [], 0
+
+    for paragraph in text.split("\n"):
+        tokens = estimate_tokens(paragraph)
+        if current and is_heading(paragraph) and size >= max_tokens // 2:
+            flush()
+        if tokens > max_tokens:
+            flush()
+            chunks.extend(_split_long_paragraph(paragraph, max_tokens))
+            continue
+        if current and size + tokens > max_tokens:
+            flush()
+        current.append(paragraph)
+        size += tokens
+    flush()
+
+    return chunks or [text]
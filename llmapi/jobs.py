@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from sqlalchemy import func
+from models import GenerationJob
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# BACKGROUND GENERATION JOBS
+# ---------------------------------------------------------
+#
+# A job runs in the uvicorn worker that accepted it, but its state is kept
+# in the generation_jobs table: GET /jobs/{id} may land on any worker.
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = "queued"  # queued → running → done | failed
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if self.result:
+            data.update(self.result)
+        return data
+
+
+STALE_ERROR = "Job was interrupted (its llmapi worker stopped), please regenerate."
+
+
+class JobStore:
+    """Job rows in the llmapi database. Methods block; call them off the event loop.
+
+    A queued or running job whose worker restarted is never finished by
+    anyone, so once it is older than ``stale_after`` seconds (counted from
+    its start, or creation while queued) it is reported as failed.
+    """
+
+    def __init__(self, session_factory, stale_after: int = 0):
+        self.session_factory = session_factory
+        self.stale_after = stale_after
+
+    def _stale(self, started: float, now: float) -> bool:
+        return self.stale_after > 0 and started < now - self.stale_after
+
+    def save(self, job: Job):
+        db = self.session_factory()
+        try:
+            db.merge(GenerationJob(
+                id=job.id,
+                status=job.status,
+                result_json=json.dumps(job.result) if job.result else None,
+                error=job.error,
+                created_at=job.created_at,
+                started_at=job.started_at,
+                finished_at=job.finished_at,
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def load(self, job_id: str):
+        db = self.session_factory()
+        try:
+            row = db.get(GenerationJob, job_id)
+        finally:
+            db.close()
+        if row is None:
+            return None
+        now = time.time()
+        if row.status in ("queued", "running") and self._stale(row.started_at or row.created_at, now):
+            row.status, row.error, row.finished_at = "failed", STALE_ERROR, now
+            self.fail_stale(now)
+        job = Job(row.id)
+        job.status = row.status
+        job.result = json.loads(row.result_json) if row.result_json else None
+        job.error = row.error
+        job.created_at = row.created_at
+        job.started_at = row.started_at
+        job.finished_at = row.finished_at
+        return job
+
+    def fail_stale(self, now: float = None) -> int:
+        """Mark unfinished jobs older than ``stale_after`` as failed."""
+        if self.stale_after <= 0:
+            return 0
+        now = now or time.time()
+        db = self.session_factory()
+        try:
+            failed = db.query(GenerationJob).filter(
+                GenerationJob.status.in_(("queued", "running")),
+                func.coalesce(GenerationJob.started_at, GenerationJob.created_at) < now - self.stale_after,
+            ).update({"status": "failed", "error": STALE_ERROR, "finished_at": now}, synchronize_session=False)
+            db.commit()
+            return failed
+        finally:
+            db.close()
+
+    def prune(self, cutoff: float):
+        self.fail_stale()
+        db = self.session_factory()
+        try:
+            db.query(GenerationJob).filter(GenerationJob.finished_at < cutoff).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+class JobManager:
+    """Bounded asyncio worker pool; finished jobs are kept for ``retention`` seconds.
+
+    With a ``store`` every state change is written through to it, and jobs
+    this process does not know are looked up there.
+    """
+
+    def __init__(self, workers: int, queue_size: int, retention: int, store: JobStore = None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.retention = retention
+        self.store = store
+        self.jobs = {}
+        self._queue = None
+        self._tasks = []
+
+    def _ensure_started(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def submit(self, func, *args) -> Job:
+        """Queue ``await func(*args)``; its dict result is merged into the job status."""
+        self._ensure_started()
+        if self._queue.full():
+            raise QueueFull()
+        await self._prune()
+        job = Job(uuid.uuid4().hex)
+        # Stored before the 202 goes out, so a poll on another worker already finds it
+        if self.store is not None:
+            await asyncio.to_thread(self.store.save, job)
+        try:
+            self._queue.put_nowait((job, func, args))
+        except asyncio.QueueFull:
+            job.status, job.error, job.finished_at = "failed", "Generation queue is full", time.time()
+            await self._persist(job)
+            raise QueueFull()
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = self.store.load(job_id)
+        return job
+
+    def stats(self) -> dict:
+        """Jobs of this process by status."""
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        counts["workers"] = self.workers
+        return counts
+
+    async def _persist(self, job: Job):
+        if self.store is None:
+            return
+        try:
+            await asyncio.to_thread(self.store.save, job)
+        except Exception:
+            logger.exception("Could not store state of job %s", job.id)
+
+    async def _worker(self):
+        while True:
+            job, func, args = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            await self._persist(job)
+            try:
+                job.result = await func(*args)
+                job.status = "done"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                await self._persist(job)
+                self._queue.task_done()
+
+    async def _prune(self):
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.prune, cutoff)
+            except Exception:
+                logger.exception("Could not prune finished jobs")
@@ -0,0 +1,70 @@
+import time
+import config
+import providers
+from metrics import LLM_REQUESTS, LLM_REQUEST_SECONDS, LLM_TOKENS
+from scheduler import Scheduler
+from singleflight import SingleFlight, request_key
+
+
+# ---------------------------------------------------------
+# NON-BLOCKING LLM CLIENT
+# ---------------------------------------------------------
+
+_provider = None
+
+# Every completion in this process goes through this: at most LLM_MAX_CONCURRENCY
+# in flight, higher priority classes first. The bucket is per process, so it gets
+# this worker's share of LLM_RATE_PER_MINUTE / LLM_BURST.
+scheduler = Scheduler(
+    max_concurrency=config.LLM_MAX_CONCURRENCY,
+    rate_per_minute=config.LLM_RATE_PER_MINUTE / config.LLM_RATE_WORKERS,
+    burst=max(1, config.LLM_BURST // config.LLM_RATE_WORKERS),
+)
+
+# Identical requests already in flight share one provider call
+flights = SingleFlight()
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = providers.make_provider()
+    return _provider
+
+
+async def chat_completion(
+    messages: list,
+    model: str,
+    temperature: float,
+    json_mode: bool = False,
+    priority: str = "generation",
+) -> str:
+    """Run one chat completion without blocking the event loop.
+
+    Waits for the scheduler to grant a slot for ``priority`` ("interactive",
+    "generation" or "bulk"). ``json_mode`` asks the provider to return a
+    single JSON object. While an identical request is in flight, the call
+    joins it instead of sending another one (the first caller's priority
+    applies to the shared call).
+    """
+    async def complete():
+        provider = get_provider()
+        async with scheduler.slot(priority):
+            started = time.perf_counter()
+            try:
+                content, usage = await provider.complete(messages, model, temperature, json_mode)
+            except Exception:
+                LLM_REQUESTS.inc(provider=provider.name, model=model, outcome="error")
+                raise
+            finally:
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, provider=provider.name, model=model)
+        LLM_REQUESTS.inc(provider=provider.name, model=model, outcome="ok")
+        if usage is not None:
+            LLM_TOKENS.inc(usage[0], provider=provider.name, model=model, kind="prompt")
+            LLM_TOKENS.inc(usage[1], provider=provider.name, model=model, kind="completion")
+        return content
+
+    if not config.LLM_COALESCE_ENABLED:
+        return await complete()
+    key = request_key(model=model, messages=messages, temperature=temperature, json_mode=json_mode)
+    return await flights.run(key, complete)
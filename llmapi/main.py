@@ -1,125 +1,209 @@
-from fastapi import FastAPI, File, UploadFile, Depends
-from fastapi.responses import JSONResponse
-from sqlalchemy import create_engine, Column, Integer, Text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-import docx
-from groq import Groq
-import os
+from fastapi import FastAPI, File, UploadFile, Depends, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from sqlalchemy.orm import Session
 import re
 from pydantic import BaseModel
+from typing import List
 import json
-from dotenv import load_dotenv
-load_dotenv()
-import os
-
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+import hashlib
+import unicodedata
+import time
+import asyncio
+import itertools
+import config
+import llm
+from jobs import JobManager, JobStore, QueueFull
+from documents import extract_docx_text, split_into_chunks
+from compression import compress_text
+from parsers import parse_questions
+from structured import generate_structured
+from database import SessionLocal, engine, get_db
+from migrations import migrate
+from lru import LRUCache
+from scheduler import PRIORITIES
+import metrics
+from metrics import Counter, Gauge, HTTP_REQUEST_SECONDS, PARSED_QUESTIONS, PARSE_FAILURES
+from serialization import serialize_question, dumps
+from models import QnaBase, Question, GenerationCache, EvaluationCache, save_question_set, SNAPSHOT_QUERY
 
 # ---------------------------------------------------------
-# APP & DB SETUP
+# APP SETUP
 # ---------------------------------------------------------
 
 app = FastAPI()
 
-DATABASE_URL = "sqlite:///./qnabase.db"
+generation_jobs = JobManager(
+    workers=config.JOB_WORKERS,
+    queue_size=config.JOB_QUEUE_SIZE,
+    retention=config.JOB_RETENTION_SECONDS,
+    store=JobStore(SessionLocal, stale_after=config.JOB_STALE_SECONDS),
+)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-Base = declarative_base()
+migrate()
 
 
 # ---------------------------------------------------------
-# DATABASE MODELS
+# METRICS
 # ---------------------------------------------------------
 
-class QnaBase(Base):
-    __tablename__ = "qnabase"
-    id = Column(Integer, primary_key=True, index=True)
-    original_text = Column(Text)
-    generated_output = Column(Text)
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Route templates ("/questions/{qna_id}") keep the label set bounded
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=route.path if route is not None else "unmatched",
+        status=response.status_code,
+    )
+    return response
 
 
-class Question(Base):
-    __tablename__ = "questions"
-    id = Column(Integer, primary_key=True, index=True)
-    qna_id = Column(Integer)
-    question_type = Column(Text)
-    question_text = Column(Text)
-    option1 = Column(Text, nullable=True)
-    option2 = Column(Text, nullable=True)
-    option3 = Column(Text, nullable=True)
-    option4 = Column(Text, nullable=True)
-    correct_option = Column(Text, nullable=True)
-    answer_text = Column(Text, nullable=True)
+Gauge("llmapi_llm_in_flight", "Completions holding a scheduler slot.",
+      collect=lambda: llm.scheduler.running)
+Gauge("llmapi_llm_waiting", "Completions queued for a scheduler slot by priority class.", ("priority",),
+      collect=lambda: {(name,): c["waiting"] for name, c in llm.scheduler.stats()["classes"].items()})
+Counter("llmapi_llm_coalesced_total", "Calls that joined an identical in-flight call instead of sending one.",
+      collect=lambda: llm.flights.coalesced)
+Gauge("llmapi_generation_jobs", "Background generation jobs by status.", ("status",),
+      collect=lambda: {(status,): count for status, count in generation_jobs.stats().items() if status != "workers"})
+Gauge("llmapi_db_pool_checked_out", "Pooled DB connections in use.",
+      collect=lambda: engine.pool.checkedout() if hasattr(engine.pool, "checkedout") else 0)
 
 
-Base.metadata.create_all(bind=engine)
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 # ---------------------------------------------------------
-# DB DEPENDENCY
+# MERGING PARSED QUESTIONS
 # ---------------------------------------------------------
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def merge_questions(groups: list, limit: int = 0) -> list:
+    """Merge per-chunk question lists, dropping duplicates.
+
+    Takes questions round-robin so every chunk is represented when ``limit``
+    cuts the list short, and renumbers MCQs to match the merged order.
+    """
+    merged = []
+    seen = set()
+    for position in range(max((len(g) for g in groups), default=0)):
+        for group in groups:
+            if position >= len(group):
+                continue
+            q = group[position]
+            key = " ".join(re.sub(r"^\d+\.\s*", "", q["question"]).lower().split())
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(q)
+
+    if limit > 0:
+        merged = merged[:limit]
+
+    for number, q in enumerate(merged, start=1):
+        if q["type"] == "mcq":
+            q["question"] = re.sub(r"^\d+\.", f"{number}.", q["question"])
+    return merged
 
 
 # ---------------------------------------------------------
-# PARSERS
+# GENERATION CACHE
 # ---------------------------------------------------------
 
-def parse_mcqs(text: str):
-    pattern = re.compile(
-        r"(?P<question>\d+\.\s+.*?\?)\s*"
-        r"a\)\s*(?P<a>.*?)\s*"
-        r"b\)\s*(?P<b>.*?)\s*"
-        r"c\)\s*(?P<c>.*?)\s*"
-        r"d\)\s*(?P<d>.*?)\s*"
-        r"(?:Correct Answer|Correct answer)[:\s]+(?P<correct>[abcdABCD])",
-        re.DOTALL
-    )
+# Bump PROMPT_VERSION whenever GENERATION_PROMPT or structured.STRUCTURED_PROMPT changes
+# so old entries stop matching.
+PROMPT_VERSION = "1"
+GENERATION_PROMPT = (
+    "Generate exactly 5 multiple-choice questions (1–5) with 4 options (a–d) and 'Correct answer: a'.\n"
+    "Then generate 5 short questions (6–10) each followed by '(Sample answer: ...)'.\n\n{text}"
+)
 
-    results = []
-    for match in pattern.finditer(text):
-        results.append({
-            "type": "mcq",
-            "question": match.group("question").strip(),
-            "choices": {
-                "a": match.group("a").strip(),
-                "b": match.group("b").strip(),
-                "c": match.group("c").strip(),
-                "d": match.group("d").strip(),
-            },
-            "correct_option": match.group("correct").strip().lower()
-        })
-    return results
-
-
-def parse_shorts(text: str):
-    short_section = ""
-    match = re.search(r"(6\..*)", text, re.DOTALL)
-    if match:
-        short_section = match.group(1)
-    else:
-        return []
 
-    pattern = re.compile(
-        r"(?P<q_num>[6-9]|10)\.\s*(?P<question>.*?)\s*\(Sample answer:\s*(?P<answer>.*?)\)",
-        re.DOTALL | re.IGNORECASE
-    )
+generation_cache_stats = {"hits": 0, "misses": 0}
+
+
+def generation_cache_key(text: str) -> str:
+    compression = config.PROMPT_COMPRESSION_TOKENS if config.PROMPT_COMPRESSION_ENABLED else 0
+    payload = "\0".join([
+        PROMPT_VERSION,
+        config.GENERATION_MODEL,
+        config.GENERATION_OUTPUT_MODE,
+        str(compression),
+        text,
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
-    results = []
-    for match in pattern.finditer(short_section):
-        results.append({
-            "type": "short",
-            "question": match.group("question").strip(),
-            "answer": match.group("answer").strip()
-        })
-    return results
+def _cache_entry_expired(entry: GenerationCache, now: float) -> bool:
+    ttl = config.GENERATION_CACHE_TTL_SECONDS
+    return ttl > 0 and now - entry.created_at > ttl
+
+
+def lookup_generation(db: Session, key: str):
+    """Return the cached QnaBase id for ``key``, or None on a miss."""
+    entry = db.query(GenerationCache).filter(GenerationCache.content_hash == key).first()
+    if entry is None:
+        # End the read transaction: the caller goes on to a long LLM call and
+        # must not keep a pooled connection checked out meanwhile
+        db.rollback()
+        generation_cache_stats["misses"] += 1
+        return None
+
+    now = time.time()
+    if _cache_entry_expired(entry, now) or db.get(QnaBase, entry.qna_id) is None:
+        db.delete(entry)
+        db.commit()
+        generation_cache_stats["misses"] += 1
+        return None
+
+    entry.last_used_at = now
+    entry.hits = (entry.hits or 0) + 1
+    db.commit()
+    generation_cache_stats["hits"] += 1
+    return entry.qna_id
+
+
+def store_generation(db: Session, key: str, qna_id: int):
+    now = time.time()
+    entry = db.query(GenerationCache).filter(GenerationCache.content_hash == key).first()
+    if entry is None:
+        entry = GenerationCache(content_hash=key, hits=0)
+        db.add(entry)
+    entry.qna_id = qna_id
+    entry.created_at = now
+    entry.last_used_at = now
+    db.commit()
+    evict_generations(db)
+
+
+def evict_generations(db: Session) -> int:
+    """Drop expired entries, then the least recently used ones above the size cap."""
+    removed = 0
+    ttl = config.GENERATION_CACHE_TTL_SECONDS
+    if ttl > 0:
+        removed += db.query(GenerationCache).filter(
+            GenerationCache.created_at < time.time() - ttl
+        ).delete(synchronize_session=False)
+
+    limit = config.GENERATION_CACHE_MAX_ENTRIES
+    if limit > 0:
+        overflow = db.query(GenerationCache).count() - limit
+        if overflow > 0:
+            stale_ids = [
+                row.id for row in db.query(GenerationCache.id)
+                .order_by(GenerationCache.last_used_at.asc())
+                .limit(overflow)
+            ]
+            removed += db.query(GenerationCache).filter(
+                GenerationCache.id.in_(stale_ids)
+            ).delete(synchronize_session=False)
+
+    db.commit()
+    return removed
 
 
 # ---------------------------------------------------------
@@ -135,98 +219,304 @@ async def root():
 # FILE UPLOAD → LLM → SAVE QUESTIONS
 # ---------------------------------------------------------
 
-@app.post("/generate-questions/")
-async def generate_questions(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    if not file.filename.endswith(".docx"):
-        return JSONResponse(content={"error": "Only .docx files allowed"}, status_code=400)
-
-    try:
-        contents = await file.read()
-        with open("temp.docx", "wb") as f:
-            f.write(contents)
-
-        doc = docx.Document("temp.docx")
-        text = "\n".join([p.text for p in doc.paragraphs])
-        os.remove("temp.docx")
-
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",
+async def generate_chunk(text: str) -> dict:
+    """Generate and parse questions for one chunk → parse_questions() shape plus "output"."""
+    mode = config.GENERATION_OUTPUT_MODE
+    if mode == "json":
+        parsed = await generate_structured(text)
+    else:
+        generated = await llm.chat_completion(
+            model=config.GENERATION_MODEL,
             messages=[
                 {"role": "system", "content": "You are a helpful education assistant."},
-                {
-                    "role": "user",
-                    "content":
-                        f"Generate exactly 5 multiple-choice questions (1–5) with 4 options (a–d) and 'Correct answer: a'.\n"
-                        f"Then generate 5 short questions (6–10) each followed by '(Sample answer: ...)'.\n\n{text}"
-                }
+                {"role": "user", "content": GENERATION_PROMPT.format(text=text)}
             ],
             temperature=0.7,
         )
+        generated = generated.strip()
+        parsed = parse_questions(generated)
+        parsed["output"] = generated
+
+    PARSED_QUESTIONS.inc(len(parsed["mcqs"]), mode=mode, kind="mcq")
+    PARSED_QUESTIONS.inc(len(parsed["shorts"]), mode=mode, kind="short")
+    PARSE_FAILURES.inc(len(parsed["errors"]), mode=mode)
+    return parsed
+
+
+async def generate_for_text(text: str, db: Session, force: bool = False) -> dict:
+    # Same text + prompt + model → reuse the stored question set (skipped with ?force=true)
+    cache_key = generation_cache_key(text)
+    if config.GENERATION_CACHE_ENABLED and not force:
+        # Blocking SQLite calls run in a thread so they never stall the event loop
+        cached_id = await asyncio.to_thread(lookup_generation, db, cache_key)
+        if cached_id is not None:
+            body, _ = await asyncio.to_thread(question_payload, cached_id, db)
+            return {
+                "saved_id": cached_id,
+                "cached": True,
+                "questions": json.loads(body),
+            }
+
+    # Optional: keep only the most salient sentences within the token budget
+    prompt_text = text
+    compression = None
+    if config.PROMPT_COMPRESSION_ENABLED:
+        compressed, compression = await asyncio.to_thread(compress_text, text, config.PROMPT_COMPRESSION_TOKENS)
+        if compressed.strip():
+            prompt_text = compressed
+
+    # Long documents: one completion per chunk, run concurrently
+    chunks = split_into_chunks(prompt_text, config.GENERATION_CHUNK_TOKENS)
+    results = await asyncio.gather(*(generate_chunk(chunk) for chunk in chunks), return_exceptions=True)
+    parsed = [r for r in results if not isinstance(r, Exception)]
+    if not parsed:
+        raise results[0]
+    chunk_errors = [
+        {"chunk": index, "error": str(r) or type(r).__name__}
+        for index, r in enumerate(results) if isinstance(r, Exception)
+    ]
+    generated = "\n\n".join(p["output"] for p in parsed)
+
+    # Merge
+    mcqs = merge_questions([p["mcqs"] for p in parsed], config.GENERATION_MAX_MCQS)
+    shorts = merge_questions([p["shorts"] for p in parsed], config.GENERATION_MAX_SHORTS)
+    parse_errors = [error for p in parsed for error in p["errors"]]
+
+    # Save base + questions in one transaction
+    saved_id = await asyncio.to_thread(save_question_set, db, text, generated, mcqs, shorts)
+
+    # A partial or empty set is returned but not cached, so the next upload tries again
+    if config.GENERATION_CACHE_ENABLED and not chunk_errors and (mcqs or shorts):
+        await asyncio.to_thread(store_generation, db, cache_key, saved_id)
+
+    result = {"saved_id": saved_id, "cached": False, "parse_errors": parse_errors}
+    if chunk_errors:
+        result["chunk_errors"] = chunk_errors
+    repairs = sum(p.get("repairs", 0) for p in parsed)
+    if repairs:
+        result["repairs"] = repairs
+    if compression is not None:
+        result["compression"] = compression
+    return result
 
-        generated = response.choices[0].message.content.strip()
 
-        # Save base
-        db_entry = QnaBase(original_text=text, generated_output=generated)
-        db.add(db_entry)
-        db.commit()
-        db.refresh(db_entry)
-
-        # Parse
-        mcqs = parse_mcqs(generated)
-        shorts = parse_shorts(generated)
-
-        # Save MCQs
-        for q in mcqs:
-            db.add(Question(
-                qna_id=db_entry.id,
-                question_type="mcq",
-                question_text=q["question"],
-                option1=q["choices"]["a"],
-                option2=q["choices"]["b"],
-                option3=q["choices"]["c"],
-                option4=q["choices"]["d"],
-                correct_option=q["correct_option"]
-            ))
-
-        # Save Short Questions
-        for q in shorts:
-            db.add(Question(
-                qna_id=db_entry.id,
-                question_type="short",
-                question_text=q["question"],
-                answer_text=q["answer"]
-            ))
+async def run_generation_job(text: str, force: bool) -> dict:
+    db = SessionLocal()
+    try:
+        result = await generate_for_text(text, db, force)
+        result.pop("questions", None)
+        return result
+    finally:
+        db.close()
 
-        db.commit()
-        return {"saved_id": db_entry.id}
+
+@app.post("/generate-questions/")
+async def generate_questions(
+    file: UploadFile = File(...),
+    force: bool = False,
+    job: bool = False,
+    db: Session = Depends(get_db),
+):
+    if not file.filename.endswith(".docx"):
+        return JSONResponse(content={"error": "Only .docx files allowed"}, status_code=400)
+
+    try:
+        contents = await file.read(config.MAX_UPLOAD_BYTES + 1)
+        if len(contents) > config.MAX_UPLOAD_BYTES:
+            return JSONResponse(
+                content={"error": f"File larger than {config.MAX_UPLOAD_BYTES} bytes"},
+                status_code=413,
+            )
+        text = await asyncio.to_thread(extract_docx_text, contents)
+
+        # Job mode: answer straight away and let the worker pool call the LLM
+        if job:
+            try:
+                queued = await generation_jobs.submit(run_generation_job, text, force)
+            except QueueFull:
+                return JSONResponse(content={"error": "Generation queue is full, try again later"}, status_code=503)
+            return JSONResponse(content=queued.to_dict(), status_code=202)
+
+        return await generate_for_text(text, db, force)
 
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    queued = generation_jobs.get(job_id)
+    if queued is None:
+        return JSONResponse(content={"error": "Job not found"}, status_code=404)
+    return queued.to_dict()
+
+
 # ---------------------------------------------------------
 # GET QUESTIONS FOR A TEST
 # ---------------------------------------------------------
 
+# A question set never changes once generate_for_text has committed it, so the
+# serialized payload can be cached in memory and by clients indefinitely.
+question_payloads = LRUCache(config.QUESTION_CACHE_MAX_ENTRIES)
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def question_payload(qna_id: int, db: Session):
+    """Return (body bytes, etag) for a stored question set, or None if it doesn't exist."""
+    cached = question_payloads.get(qna_id)
+    if cached is not None:
+        return cached
+
+    row = db.execute(SNAPSHOT_QUERY, {"id": qna_id}).first()
+    if row is None:
+        return None
+    payload = make_payload(qna_id, row.questions_json, db)
+    question_payloads.put(qna_id, payload)
+    return payload
+
+
+def make_payload(qna_id: int, snapshot, db: Session):
+    # The snapshot written at generation time is the response body; rebuild
+    # from the question rows only if it is missing
+    if snapshot is None:
+        questions = db.query(Question).filter(Question.qna_id == qna_id).order_by(Question.id).all()
+        snapshot = dumps([serialize_question(q) for q in questions])
+    body = bytes(snapshot)
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def question_payloads_for(qna_ids: list, db: Session) -> dict:
+    """Payloads for many ids: LRU first, then one indexed IN query per 500 missing ids."""
+    payloads = {}
+    missing = []
+    for qna_id in qna_ids:
+        cached = question_payloads.get(qna_id)
+        if cached is not None:
+            payloads[qna_id] = cached
+        else:
+            missing.append(qna_id)
+
+    for start in range(0, len(missing), 500):
+        chunk = missing[start:start + 500]
+        rows = db.query(QnaBase.id, QnaBase.questions_json).filter(QnaBase.id.in_(chunk))
+        for row in rows:
+            payload = make_payload(row.id, row.questions_json, db)
+            question_payloads.put(row.id, payload)
+            payloads[row.id] = payload
+
+    return payloads
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
 @app.get("/questions/{qna_id}")
-def get_questions(qna_id: int, db: Session = Depends(get_db)):
-    questions = db.query(Question).filter(Question.qna_id == qna_id).all()
-    result = []
-    for q in questions:
-        result.append({
-            "id": q.id,
-            "type": q.question_type,
-            "question": q.question_text,
-            "choices": {
-                "a": q.option1,
-                "b": q.option2,
-                "c": q.option3,
-                "d": q.option4,
-            } if q.question_type == "mcq" else None,
-            "correct_option": q.correct_option,
-            "answer": q.answer_text
-        })
-    return result
+def get_questions(qna_id: int, request: Request, db: Session = Depends(get_db)):
+    payload = question_payload(qna_id, db)
+    if payload is None:
+        # Unknown (or not yet generated) id: keep the old empty-list answer, but never cache it
+        return JSONResponse(content=[], headers={"Cache-Control": "no-store"})
+
+    body, etag = payload
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# ---------------------------------------------------------
+# GET QUESTIONS FOR MANY TESTS
+# ---------------------------------------------------------
+
+class QuestionBatchRequest(BaseModel):
+    ids: List[int]
+
+
+def batch_response(qna_ids: list, db: Session):
+    qna_ids = list(dict.fromkeys(qna_ids))
+    if len(qna_ids) > config.QUESTION_BATCH_MAX_IDS:
+        return JSONResponse(
+            content={"error": f"At most {config.QUESTION_BATCH_MAX_IDS} ids per request"},
+            status_code=413,
+        )
+    payloads = question_payloads_for(qna_ids, db)
+
+    # {"<qna_id>": [...questions...], ...}, unknown ids map to []
+    def parts():
+        yield b"{"
+        for position, qna_id in enumerate(qna_ids):
+            body = payloads[qna_id][0] if qna_id in payloads else b"[]"
+            yield (b"," if position else b"") + f'"{qna_id}":'.encode() + body
+        yield b"}"
+
+    if len(qna_ids) > config.QUESTION_BATCH_STREAM_THRESHOLD:
+        return StreamingResponse(parts(), media_type="application/json")
+    return Response(content=b"".join(parts()), media_type="application/json")
+
+
+@app.get("/questions")
+def get_questions_batch(ids: str, db: Session = Depends(get_db)):
+    try:
+        qna_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        return JSONResponse(content={"error": "ids must be comma-separated integers"}, status_code=400)
+    return batch_response(qna_ids, db)
+
+
+@app.post("/questions/batch")
+def post_questions_batch(data: QuestionBatchRequest, db: Session = Depends(get_db)):
+    return batch_response(data.ids, db)
+
+
+# ---------------------------------------------------------
+# LLM SCHEDULER
+# ---------------------------------------------------------
+
+@app.get("/llm/stats")
+def llm_stats():
+    return {**llm.scheduler.stats(), "coalescing": llm.flights.stats()}
+
+
+# ---------------------------------------------------------
+# CACHE MAINTENANCE
+# ---------------------------------------------------------
+
+@app.post("/cache/generations/evict")
+def evict_generation_cache(db: Session = Depends(get_db)):
+    return {"removed": evict_generations(db)}
+
+
+@app.delete("/cache/generations")
+def clear_generation_cache(db: Session = Depends(get_db)):
+    removed = db.query(GenerationCache).delete(synchronize_session=False)
+    db.commit()
+    return {"removed": removed}
+
+
+@app.delete("/cache/evaluations")
+def clear_evaluation_cache(db: Session = Depends(get_db)):
+    removed = db.query(EvaluationCache).delete(synchronize_session=False)
+    db.commit()
+    return {"removed": removed}
+
+
+@app.get("/cache/stats")
+def cache_stats(db: Session = Depends(get_db)):
+    return {
+        "generations": {
+            "entries": db.query(GenerationCache).count(),
+            **generation_cache_stats,
+        },
+        "evaluations": {
+            "entries": db.query(EvaluationCache).count(),
+            **evaluation_cache_stats,
+        },
+        "question_payloads": question_payloads.stats(),
+    }
 
 
 # ---------------------------------------------------------
@@ -239,8 +529,121 @@ class EvalRequest(BaseModel):
     student: str
 
 
-@app.post("/evaluate-answer/")
-async def evaluate_answer(data: EvalRequest):
+# ---------------------------------------------------------
+# EVALUATION CACHE
+# ---------------------------------------------------------
+
+EVAL_PROMPT_VERSION = "2"  # 2: numbers keep their sign / decimal point in normalize_answer
+evaluation_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+NUMBER_PUNCTUATION = ".,/-"
+
+
+def normalize_answer(text: str) -> str:
+    """Lower-case, turn punctuation into spaces and collapse whitespace.
+
+    ``. , / -`` are kept in front of a digit so "3.5", "-5" and "1/2" stay
+    distinct from "35", "5" and "12".
+    """
+    text = text.lower()
+    chars = []
+    for index, ch in enumerate(text):
+        if unicodedata.category(ch).startswith("P"):
+            before_digit = index + 1 < len(text) and text[index + 1].isdigit()
+            chars.append(ch if ch in NUMBER_PUNCTUATION and before_digit else " ")
+        else:
+            chars.append(ch)
+    return " ".join("".join(chars).split())
+
+
+def evaluation_cache_key(data: EvalRequest) -> str:
+    payload = "\0".join([
+        EVAL_PROMPT_VERSION,
+        config.EVALUATION_MODEL,
+        data.prompt.strip(),
+        data.expected.strip(),
+        normalize_answer(data.student),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup_evaluation(key: str):
+    db = SessionLocal()
+    try:
+        entry = db.query(EvaluationCache).filter(EvaluationCache.answer_hash == key).first()
+        if entry is None:
+            evaluation_cache_stats["misses"] += 1
+            return None
+        entry.last_used_at = time.time()
+        entry.hits = (entry.hits or 0) + 1
+        db.commit()
+        evaluation_cache_stats["hits"] += 1
+        return {"score": entry.score, "feedback": entry.feedback}
+    finally:
+        db.close()
+
+
+# New entries stored by this process; eviction runs on every EVICT_EVERY-th one
+_evaluation_inserts = itertools.count(1)
+
+
+def store_evaluation(key: str, result: dict):
+    db = SessionLocal()
+    try:
+        now = time.time()
+        entry = db.query(EvaluationCache).filter(EvaluationCache.answer_hash == key).first()
+        inserted = entry is None
+        if inserted:
+            entry = EvaluationCache(answer_hash=key, hits=0, created_at=now)
+            db.add(entry)
+        entry.score = result["score"]
+        entry.feedback = result.get("feedback", "")
+        entry.last_used_at = now
+        db.commit()
+
+        if inserted and next(_evaluation_inserts) % max(config.EVALUATION_CACHE_EVICT_EVERY, 1) == 0:
+            evict_evaluations(db)
+    finally:
+        db.close()
+
+
+def evict_evaluations(db: Session) -> int:
+    """Size-based eviction: keep the most recently used entries."""
+    limit = config.EVALUATION_CACHE_MAX_ENTRIES
+    if limit <= 0:
+        return 0
+    overflow = db.query(EvaluationCache).count() - limit
+    if overflow <= 0:
+        return 0
+    stale_ids = [
+        row.id for row in db.query(EvaluationCache.id)
+        .order_by(EvaluationCache.last_used_at.asc())
+        .limit(overflow)
+    ]
+    db.query(EvaluationCache).filter(
+        EvaluationCache.id.in_(stale_ids)
+    ).delete(synchronize_session=False)
+    db.commit()
+    evaluation_cache_stats["evictions"] += len(stale_ids)
+    return len(stale_ids)
+
+
+def is_grading(result) -> bool:
+    if not isinstance(result, dict):
+        return False
+    score = result.get("score")
+    return isinstance(score, (int, float)) and not isinstance(score, bool)
+
+
+async def evaluate(data: EvalRequest, priority: str = "interactive") -> dict:
+    cache_key = None
+    if config.EVALUATION_CACHE_ENABLED:
+        cache_key = evaluation_cache_key(data)
+        cached = await asyncio.to_thread(lookup_evaluation, cache_key)
+        if cached is not None:
+            return cached
+
     full_prompt = f"""
 You are a strict but fair evaluator.
 
@@ -257,13 +660,66 @@ Return ONLY this JSON:
 {{"score": float (0-5), "feedback": "string"}}
 """
 
-    response = client.chat.completions.create(
-        model="llama3-8b-8192",
+    content = await llm.chat_completion(
+        model=config.EVALUATION_MODEL,
         messages=[{"role": "user", "content": full_prompt}],
         temperature=0.2,
+        priority=priority,
     )
 
     try:
-        return json.loads(response.choices[0].message.content)
-    except:
-        return {"score": 0.0, "feedback": "Could not parse Groq response."}
+        result = json.loads(content)
+    except ValueError:
+        result = None
+    # Valid JSON is not enough: it must be an object with a numeric score
+    if not is_grading(result):
+        return {"score": 0.0, "feedback": "Could not parse model response."}
+
+    # Only well-formed gradings are worth remembering
+    if cache_key is not None:
+        await asyncio.to_thread(store_evaluation, cache_key, result)
+    return result
+
+
+@app.post("/evaluate-answer/")
+async def evaluate_answer(data: EvalRequest):
+    return await evaluate(data)
+
+
+# ---------------------------------------------------------
+# BATCH EVALUATION
+# ---------------------------------------------------------
+
+class EvalBatchRequest(BaseModel):
+    items: List[EvalRequest]
+    # "interactive" when a student is waiting on the page, "bulk" for backfills
+    priority: str = "bulk"
+
+
+@app.post("/evaluate-answers/batch")
+async def evaluate_answers_batch(data: EvalBatchRequest):
+    if len(data.items) > config.EVAL_BATCH_MAX_ITEMS:
+        return JSONResponse(
+            content={"error": f"At most {config.EVAL_BATCH_MAX_ITEMS} items per batch"},
+            status_code=413,
+        )
+
+    if data.priority not in PRIORITIES:
+        return JSONResponse(
+            content={"error": f"priority must be one of {', '.join(PRIORITIES)}"},
+            status_code=400,
+        )
+
+    slots = asyncio.Semaphore(config.EVAL_BATCH_CONCURRENCY)
+
+    async def run(index: int, item: EvalRequest) -> dict:
+        async with slots:
+            try:
+                result = await evaluate(item, data.priority)
+                return {"index": index, "ok": True, "score": result["score"], "feedback": result.get("feedback", "")}
+            except Exception as e:
+                return {"index": index, "ok": False, "error": str(e)}
+
+    # Failures are reported per item so one bad call doesn't sink the batch
+    results = await asyncio.gather(*(run(i, item) for i, item in enumerate(data.items)))
+    return {"results": results}
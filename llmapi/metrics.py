@@ -0,0 +1,164 @@
+import threading
+
+
+# ---------------------------------------------------------
+# PROMETHEUS METRICS (text exposition format, no client library)
+# ---------------------------------------------------------
+#
+# Values live in this process only: with several uvicorn workers each one
+# reports its own series, so scrape every worker (or sum in the query).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REGISTRY = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base for all metric types.
+
+    ``collect``, if given, is called at scrape time and returns the current
+    value: a number (no labels) or a dict of label tuple → value. Use it for
+    figures another object already tracks (queue depth, pool usage).
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=(), collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list:
+        if self.collect is not None:
+            current = self.collect()
+            with self._lock:
+                self._values = current if isinstance(current, dict) else {(): current}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(self._samples(items))
+        return lines
+
+    def _samples(self, items) -> list:
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def _samples(self, items) -> list:
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = (("le", _number(bound)),)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------
+# SERVICE METRICS
+# ---------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "llmapi_http_request_duration_seconds", "Request latency by route template.",
+    ("method", "route", "status"),
+)
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llmapi_llm_request_duration_seconds", "Provider call latency, excluding time queued in the scheduler.",
+    ("provider", "model"),
+)
+LLM_REQUESTS = Counter(
+    "llmapi_llm_requests_total", "Provider calls by outcome (ok / error).",
+    ("provider", "model", "outcome"),
+)
+LLM_TOKENS = Counter(
+    "llmapi_llm_tokens_total", "Tokens reported by the provider (kind = prompt / completion).",
+    ("provider", "model", "kind"),
+)
+
+PARSED_QUESTIONS = Counter(
+    "llmapi_parsed_questions_total", "Questions read from generation output (kind = mcq / short).",
+    ("mode", "kind"),
+)
+PARSE_FAILURES = Counter(
+    "llmapi_parse_failures_total", "Generated items that could not be used.",
+    ("mode",),
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "llmapi_db_query_duration_seconds", "SQL statement latency by statement type.",
+    ("operation",),
+)
+DB_SESSION_SECONDS = Histogram(
+    "llmapi_db_session_duration_seconds", "Lifetime of request-scoped DB sessions.",
+)
@@ -0,0 +1,156 @@
+import logging
+import time
+from contextlib import contextmanager
+from sqlalchemy import inspect, text
+import config
+from database import engine, Base
+from serialization import serialize_question, dumps
+import models  # noqa: F401  (registers the tables on Base.metadata)
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# VERSIONED SCHEMA MIGRATIONS
+# ---------------------------------------------------------
+#
+# Append new steps to MIGRATIONS; never edit or reorder applied ones.
+# Every uvicorn worker runs migrate() on startup. The whole run holds one
+# exclusive lock (BEGIN IMMEDIATE on SQLite, an advisory lock elsewhere),
+# so workers starting together apply the steps once, one after another.
+# Steps stay idempotent (IF NOT EXISTS, checkfirst) for databases that
+# were partly migrated by hand.
+
+def _baseline(conn):
+    # qnabase / questions / cache tables as created by create_all before versioning
+    Base.metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _index_questions_qna_id(conn):
+    # GET /questions/{qna_id} was a full scan of questions without this
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_qna_id ON questions (qna_id)"))
+
+
+def _index_generation_cache_last_used(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_generation_cache_last_used_at ON generation_cache (last_used_at)"
+    ))
+
+
+def _snapshot_column(conn):
+    columns = {c["name"] for c in inspect(conn).get_columns("qnabase")}
+    if "questions_json" not in columns:
+        conn.execute(text("ALTER TABLE qnabase ADD COLUMN questions_json BLOB"))
+
+    # Backfill sets generated before snapshots existed
+    pending = [row[0] for row in conn.execute(text("SELECT id FROM qnabase WHERE questions_json IS NULL"))]
+    for qna_id in pending:
+        rows = conn.execute(
+            text("SELECT * FROM questions WHERE qna_id = :id ORDER BY id"), {"id": qna_id}
+        ).mappings().all()
+        conn.execute(
+            text("UPDATE qnabase SET questions_json = :snapshot WHERE id = :id"),
+            {"snapshot": dumps([serialize_question(dict(row)) for row in rows]), "id": qna_id},
+        )
+
+
+def _generation_jobs_table(conn):
+    # Job state moved out of worker memory so any worker can answer GET /jobs/{id}
+    models.GenerationJob.__table__.create(bind=conn, checkfirst=True)
+
+
+MIGRATIONS = [
+    (1, "baseline tables", _baseline),
+    (2, "index questions.qna_id", _index_questions_qna_id),
+    (3, "index generation_cache.last_used_at", _index_generation_cache_last_used),
+    (4, "qnabase.questions_json snapshots", _snapshot_column),
+    (5, "generation_jobs table", _generation_jobs_table),
+]
+
+
+MIGRATION_LOCK_NAME = "llmapi_schema_migrations"
+MIGRATION_LOCK_TIMEOUT_SECONDS = 600
+
+
+def current_version(conn) -> int:
+    row = conn.execute(text("SELECT MAX(version) FROM schema_migrations")).first()
+    return row[0] or 0
+
+
+@contextmanager
+def _migration_lock(target_engine):
+    """A connection holding the process-wide migration lock until the block exits."""
+    dialect = target_engine.dialect.name
+    if dialect == "sqlite":
+        # Autocommit at the driver level so BEGIN IMMEDIATE / COMMIT below are
+        # the only transaction; it takes the write lock before anything is read.
+        with target_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            # Wait for the worker holding the lock, then hand the pooled connection
+            # back with the normal busy timeout
+            conn.exec_driver_sql(f"PRAGMA busy_timeout={MIGRATION_LOCK_TIMEOUT_SECONDS * 1000}")
+            try:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.exec_driver_sql("ROLLBACK")
+                    raise
+                conn.exec_driver_sql("COMMIT")
+            finally:
+                conn.exec_driver_sql(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        return
+
+    with target_engine.connect() as conn:
+        if dialect == "mysql":
+            conn.execute(text("SELECT GET_LOCK(:name, :timeout)"),
+                         {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT_SECONDS})
+            release = text("SELECT RELEASE_LOCK(:name)")
+        elif dialect == "postgresql":
+            conn.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": MIGRATION_LOCK_NAME})
+            release = text("SELECT pg_advisory_unlock(hashtext(:name))")
+        else:
+            release = None
+        conn.commit()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            if release is not None:
+                conn.execute(release, {"name": MIGRATION_LOCK_NAME})
+                conn.commit()
+
+
+def _record(conn, version, description):
+    insert = {"sqlite": "INSERT OR IGNORE", "mysql": "INSERT IGNORE"}.get(conn.dialect.name, "INSERT")
+    conn.execute(
+        text(f"{insert} INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+        {"v": version, "d": description, "t": time.time()},
+    )
+
+
+def migrate(target_engine=engine) -> int:
+    """Apply pending migrations in order and return the resulting schema version."""
+    with _migration_lock(target_engine) as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description TEXT, applied_at FLOAT)"
+        ))
+        # Read under the lock: a worker that waited sees what the first one applied
+        version_now = current_version(conn)
+        for version, description, step in MIGRATIONS:
+            if version <= version_now:
+                continue
+            step(conn)
+            _record(conn, version, description)
+            if conn.dialect.name != "sqlite":
+                conn.commit()
+            logger.info("Applied migration %s: %s", version, description)
+        return current_version(conn)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Schema version %s", migrate())
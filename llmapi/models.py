@@ -0,0 +1,131 @@
+from sqlalchemy import Column, Integer, Text, String, Float, LargeBinary, insert, select, update, bindparam
+from sqlalchemy.orm import Session
+from database import Base
+from serialization import serialize_question, dumps
+
+
+# ---------------------------------------------------------
+# DATABASE MODELS
+# ---------------------------------------------------------
+
+class QnaBase(Base):
+    __tablename__ = "qnabase"
+    id = Column(Integer, primary_key=True, index=True)
+    original_text = Column(Text)
+    generated_output = Column(Text)
+    # Serialized GET /questions/{id} body, written once with the questions
+    questions_json = Column(LargeBinary, nullable=True)
+
+
+class Question(Base):
+    __tablename__ = "questions"
+    id = Column(Integer, primary_key=True, index=True)
+    qna_id = Column(Integer, index=True)
+    question_type = Column(Text)
+    question_text = Column(Text)
+    option1 = Column(Text, nullable=True)
+    option2 = Column(Text, nullable=True)
+    option3 = Column(Text, nullable=True)
+    option4 = Column(Text, nullable=True)
+    correct_option = Column(Text, nullable=True)
+    answer_text = Column(Text, nullable=True)
+
+
+class GenerationCache(Base):
+    __tablename__ = "generation_cache"
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True)
+    qna_id = Column(Integer)
+    created_at = Column(Float)
+    last_used_at = Column(Float, index=True)
+    hits = Column(Integer, default=0)
+
+
+class EvaluationCache(Base):
+    __tablename__ = "evaluation_cache"
+    id = Column(Integer, primary_key=True, index=True)
+    answer_hash = Column(String(64), unique=True, index=True)
+    score = Column(Float)
+    feedback = Column(Text)
+    created_at = Column(Float)
+    last_used_at = Column(Float, index=True)
+    hits = Column(Integer, default=0)
+
+
+class GenerationJob(Base):
+    # Background generation jobs, shared by every uvicorn worker (see jobs.py)
+    __tablename__ = "generation_jobs"
+    id = Column(String(32), primary_key=True)
+    status = Column(String(16))
+    result_json = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(Float)
+    started_at = Column(Float, nullable=True)
+    finished_at = Column(Float, nullable=True, index=True)
+
+
+# Core statement for the read path: skips ORM entity loading entirely
+SNAPSHOT_QUERY = select(QnaBase.id, QnaBase.questions_json).where(QnaBase.id == bindparam("id"))
+
+
+# ---------------------------------------------------------
+# BULK PERSISTENCE
+# ---------------------------------------------------------
+
+def question_rows(qna_id: int, mcqs: list, shorts: list) -> list:
+    rows = []
+    for q in mcqs:
+        rows.append({
+            "qna_id": qna_id,
+            "question_type": "mcq",
+            "question_text": q["question"],
+            "option1": q["choices"]["a"],
+            "option2": q["choices"]["b"],
+            "option3": q["choices"]["c"],
+            "option4": q["choices"]["d"],
+            "correct_option": q["correct_option"],
+            "answer_text": None,
+        })
+    for q in shorts:
+        rows.append({
+            "qna_id": qna_id,
+            "question_type": "short",
+            "question_text": q["question"],
+            "option1": None,
+            "option2": None,
+            "option3": None,
+            "option4": None,
+            "correct_option": None,
+            "answer_text": q["answer"],
+        })
+    return rows
+
+
+def build_snapshot(db: Session, qna_id: int, rows: list) -> bytes:
+    """Serialize freshly inserted question rows, picking up their ids in insert order."""
+    ids = db.execute(
+        select(Question.id).where(Question.qna_id == qna_id).order_by(Question.id)
+    ).scalars().all()
+    return dumps([serialize_question(dict(row, id=question_id)) for row, question_id in zip(rows, ids)])
+
+
+def save_question_set(db: Session, original_text: str, generated_output: str, mcqs: list, shorts: list) -> int:
+    """Insert the QnaBase row, all its questions and their JSON snapshot in one transaction.
+
+    The base row's id comes straight from the INSERT (no refresh query) and
+    the questions go in as a single executemany.
+    """
+    try:
+        result = db.execute(insert(QnaBase).values(original_text=original_text, generated_output=generated_output))
+        qna_id = result.inserted_primary_key[0]
+        rows = question_rows(qna_id, mcqs, shorts)
+        if rows:
+            db.execute(insert(Question), rows)
+        db.execute(
+            update(QnaBase).where(QnaBase.id == qna_id).values(questions_json=build_snapshot(db, qna_id, rows))
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return qna_id
@@ -0,0 +1,171 @@
+import re
+
+
+# ---------------------------------------------------------
+# SINGLE-PASS QUESTION PARSER
+# ---------------------------------------------------------
+#
+# The model output is read line by line. Every line is classified with a
+# short anchored pattern (no lazy ``.*?`` chains spanning the whole text, so
+# nothing to backtrack over) and fed into a small state machine that tracks
+# the question being built and which field continuation lines belong to.
+
+QUESTION_RE = re.compile(r"(?:q(?:uestion)?\s*)?(\d{1,3})\s*[.):](?!\d)\s*(.*)", re.IGNORECASE)
+OPTION_RE = re.compile(r"\(?([a-d])\s*[).:]\s*(.*)", re.IGNORECASE)
+INLINE_OPTION_RE = re.compile(r"\s\(?([b-dB-D])\)\s*")
+ANSWER_RE = re.compile(r"(?:correct\s+)?(?:answer|option)(?:\s+is)?\s*[:\-]?\s*\(?([a-d])\b", re.IGNORECASE)
+SAMPLE_MARKER = "(sample answer:"
+
+
+def _clean(line: str) -> str:
+    # Markdown emphasis / headings the model likes to add
+    return line.strip().strip("*_#").strip()
+
+
+class _Draft:
+    def __init__(self, number: int, text: str):
+        self.number = number
+        self.text = [text] if text else []
+        self.options = {}
+        self.correct = None
+        self.answer = None
+        self.depth = 0
+        self.field = "question"  # question | a-d | answer | done
+
+    @property
+    def answer_open(self) -> bool:
+        return self.field == "answer"
+
+    def add_text(self, text: str):
+        if self.field == "question":
+            self.text.append(text)
+        elif self.field in self.options:
+            self.options[self.field].append(text)
+
+    def start_answer(self, rest: str):
+        self.field = "answer"
+        self.answer = []
+        self.depth = 0
+        self.feed_answer(rest)
+
+    def feed_answer(self, text: str):
+        # The answer ends at the ")" that closes "(Sample answer:"
+        depth = self.depth
+        for i, ch in enumerate(text):
+            if ch == "(":
+                depth += 1
+            elif ch == ")":
+                depth -= 1
+                if depth < 0:
+                    text = text[:i]
+                    self.field = "done"
+                    break
+        self.depth = depth
+        text = text.strip()
+        if text:
+            self.answer.append(text)
+
+
+def _finish(draft: _Draft, mcqs: list, shorts: list, errors: list):
+    question = " ".join(draft.text).strip()
+    if not question:
+        errors.append({"number": draft.number, "error": "empty question text"})
+        return
+
+    if draft.options:
+        missing = [letter for letter in "abcd" if letter not in draft.options]
+        if missing:
+            errors.append({"number": draft.number, "error": f"missing option(s) {', '.join(missing)}"})
+            return
+        if draft.correct is None:
+            errors.append({"number": draft.number, "error": "missing correct answer"})
+            return
+        mcqs.append({
+            "type": "mcq",
+            "question": f"{draft.number}. {question}",
+            "choices": {letter: " ".join(draft.options[letter]).strip() for letter in "abcd"},
+            "correct_option": draft.correct,
+        })
+    elif draft.answer is not None:
+        answer = " ".join(draft.answer).strip()
+        if not answer:
+            errors.append({"number": draft.number, "error": "empty sample answer"})
+            return
+        shorts.append({"type": "short", "question": question, "answer": answer})
+    else:
+        errors.append({"number": draft.number, "error": "no options or sample answer"})
+
+
+def _split_sample(text: str):
+    """Split ``text`` at a '(Sample answer:' marker → (before, after) or (text, None)."""
+    at = text.lower().find(SAMPLE_MARKER)
+    if at < 0:
+        return text, None
+    return text[:at].rstrip(), text[at + len(SAMPLE_MARKER):]
+
+
+def parse_questions(text: str) -> dict:
+    """Parse MCQs and short questions from model output in one linear pass.
+
+    Any number of questions in any order is accepted: an item with options a–d
+    and a correct answer is an MCQ, an item with '(Sample answer: ...)' is a
+    short question. Returns ``{"mcqs": [...], "shorts": [...], "errors": [...]}``
+    where every numbered item that could not be used gets an error entry
+    instead of being dropped silently.
+    """
+    mcqs, shorts, errors = [], [], []
+    draft = None
+
+    for raw in text.splitlines():
+        line = _clean(raw)
+        if not line:
+            continue
+
+        question = QUESTION_RE.match(line)
+
+        # An unterminated sample answer ends at the next numbered question
+        if draft is not None and draft.answer_open and not question:
+            draft.feed_answer(line)
+            continue
+
+        if question:
+            if draft is not None:
+                _finish(draft, mcqs, shorts, errors)
+            before, sample = _split_sample(question.group(2))
+            draft = _Draft(int(question.group(1)), before)
+            if sample is not None:
+                draft.start_answer(sample)
+            continue
+
+        if draft is None:
+            continue  # preamble such as "Here are your questions:"
+
+        answer = ANSWER_RE.match(line)
+        if answer and draft.options:
+            draft.correct = answer.group(1).lower()
+            draft.field = "done"
+            continue
+
+        option = OPTION_RE.match(line)
+        if option and draft.field != "done":
+            # Options may also come on one line: "a) x b) y c) z d) w"
+            parts = INLINE_OPTION_RE.split(" " + option.group(2))
+            draft.options[option.group(1).lower()] = [parts[0].strip()]
+            for i in range(1, len(parts) - 1, 2):
+                draft.options[parts[i].lower()] = [parts[i + 1].strip()]
+            draft.field = max(draft.options)
+            continue
+
+        before, sample = _split_sample(line)
+        if sample is not None:
+            if before:
+                draft.add_text(before)
+            draft.start_answer(sample)
+            continue
+
+        draft.add_text(line)
+
+    if draft is not None:
+        _finish(draft, mcqs, shorts, errors)
+
+    return {"mcqs": mcqs, "shorts": shorts, "errors": errors}
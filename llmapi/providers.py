@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from groq import AsyncGroq
+import config
+from documents import estimate_tokens
+
+
+# ---------------------------------------------------------
+# LLM PROVIDERS (selected with LLM_PROVIDER)
+# ---------------------------------------------------------
+#
+# A provider turns one chat request into ``(completion text, usage)`` where
+# usage is ``(prompt_tokens, completion_tokens)`` or None. Scheduling,
+# coalescing and priorities stay in llm.py, so they apply to every backend.
+
+class GroqProvider:
+    name = "groq"
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = AsyncGroq(api_key=config.GROQ_API_KEY, timeout=config.LLM_TIMEOUT_SECONDS)
+        return self._client
+
+    async def complete(self, messages: list, model: str, temperature: float, json_mode: bool) -> tuple:
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **extra,
+        )
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            usage = (usage.prompt_tokens, usage.completion_tokens)
+        return response.choices[0].message.content, usage
+
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z\-]{4,}")
+FILLER = ["process", "structure", "function", "system", "principle", "method", "concept", "element"]
+
+
+class StubProvider:
+    """Offline backend that answers like the real model, with no network.
+
+    The response depends only on the request and ``seed``, so repeated runs
+    are reproducible. Latency is log-normal around ``latency_ms`` (``sigma``
+    0 makes it constant); ``malformed_rate`` is the share of generated items
+    left broken (missing answer / options) to exercise parsing and repair.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency_ms: float = 0.0, sigma: float = 0.0, malformed_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.malformed_rate = malformed_rate
+        self.seed = seed
+
+    async def complete(self, messages: list, model: str, temperature: float, json_mode: bool) -> tuple:
+        text = await self._respond(messages, model, json_mode)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        return text, (prompt_tokens, estimate_tokens(text))
+
+    async def _respond(self, messages: list, model: str, json_mode: bool) -> str:
+        prompt = messages[-1]["content"]
+        digest = hashlib.sha256(f"{self.seed}\0{model}\0{json_mode}\0{prompt}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+
+        if self.latency_ms > 0:
+            delay = self.latency_ms * math.exp(rng.gauss(0, self.sigma)) if self.sigma else self.latency_ms
+            await asyncio.sleep(delay / 1000)
+
+        if "Student's Answer:" in prompt:
+            return self._evaluation(prompt, rng)
+        if "failed validation" in prompt:
+            return self._repair(prompt, rng)
+        if json_mode:
+            return json.dumps(self._questions(prompt, rng, as_json=True))
+        return self._questions(prompt, rng, as_json=False)
+
+    def _topics(self, prompt: str) -> list:
+        # Generation prompts end with the source text after a blank line
+        words = sorted({w.lower() for w in WORD_RE.findall(prompt.rsplit("\n\n", 1)[-1])})
+        return words or FILLER
+
+    def _questions(self, prompt: str, rng, as_json: bool):
+        topics = self._topics(prompt)
+        mcqs, shorts = [], []
+        for _ in range(5):
+            topic, other = rng.choice(topics), rng.choice(topics)
+            options = {letter: f"{rng.choice(FILLER).capitalize()} of {rng.choice(topics)}" for letter in "abcd"}
+            mcqs.append({
+                "question": f"Which statement best describes the role of {topic} in relation to {other}?",
+                "options": options,
+                "correct_option": rng.choice("abcd"),
+            })
+        for _ in range(5):
+            topic = rng.choice(topics)
+            detail = " ".join(rng.choice(topics) for _ in range(rng.randint(3, 12)))
+            shorts.append({
+                "question": f"Explain the significance of {topic}.",
+                "sample_answer": f"{topic.capitalize()} matters because of {detail}.",
+            })
+
+        broken = [rng.random() < self.malformed_rate for _ in range(10)]
+        if as_json:
+            for item, bad in zip(mcqs + shorts, broken):
+                if bad:
+                    item["correct_option" if "options" in item else "sample_answer"] = ""
+            return {"mcqs": mcqs, "shorts": shorts}
+
+        lines = []
+        for number, (mcq, bad) in enumerate(zip(mcqs, broken), start=1):
+            lines.append(f"{number}. {mcq['question']}")
+            lines.extend(f"{letter}) {text}" for letter, text in mcq["options"].items())
+            if not bad:
+                lines.append(f"Correct answer: {mcq['correct_option']}")
+            lines.append("")
+        for number, (short, bad) in enumerate(zip(shorts, broken[5:]), start=6):
+            lines.append(f"{number}. {short['question']}")
+            if not bad:
+                lines.append(f"(Sample answer: {short['sample_answer']})")
+            lines.append("")
+        return "Here are your questions:\n\n" + "\n".join(lines)
+
+    def _repair(self, prompt: str, rng) -> str:
+        try:
+            items = json.loads(prompt.rsplit("\n\n", 1)[1])
+        except (IndexError, ValueError):
+            return json.dumps({"items": []})
+        fixed = []
+        for entry in items:
+            item = dict(entry.get("item") or {}) if isinstance(entry.get("item"), dict) else {}
+            if entry.get("kind") == "mcq":
+                item.setdefault("question", "Which option is correct?")
+                options = item.get("options") if isinstance(item.get("options"), dict) else {}
+                item["options"] = {letter: options.get(letter) or f"Option {letter}" for letter in "abcd"}
+                if item.get("correct_option") not in ("a", "b", "c", "d"):
+                    item["correct_option"] = rng.choice("abcd")
+            else:
+                item["question"] = item.get("question") or "Explain the topic."
+                item["sample_answer"] = item.get("sample_answer") or "It is explained in the text."
+            fixed.append({"id": entry.get("id"), **item})
+        return json.dumps({"items": fixed})
+
+    def _evaluation(self, prompt: str, rng) -> str:
+        def section(title):
+            match = re.search(rf"{title}:\n(.*?)(?:\n\n|$)", prompt, re.DOTALL)
+            return set(WORD_RE.findall(match.group(1).lower())) if match else set()
+
+        expected, student = section("Expected Answer"), section("Student's Answer")
+        overlap = len(expected & student) / len(expected | student) if expected | student else 0.0
+        score = round(min(5.0, max(0.0, overlap * 5 + rng.uniform(-0.5, 0.5))), 1)
+        feedback = "Covers the key points." if score >= 3 else "Misses several points from the expected answer."
+        return json.dumps({"score": score, "feedback": feedback})
+
+
+def make_provider():
+    if config.LLM_PROVIDER == "stub":
+        return StubProvider(
+            latency_ms=config.LLM_STUB_LATENCY_MS,
+            sigma=config.LLM_STUB_LATENCY_SIGMA,
+            malformed_rate=config.LLM_STUB_MALFORMED_RATE,
+            seed=config.LLM_STUB_SEED,
+        )
+    if config.LLM_PROVIDER == "groq":
+        return GroqProvider()
+    raise ValueError(f"Unknown LLM_PROVIDER: {config.LLM_PROVIDER}")
@@ -0,0 +1,128 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+
+
+# ---------------------------------------------------------
+# PRIORITY SCHEDULER FOR LLM CALLS
+# ---------------------------------------------------------
+
+# Lower value wins. A waiting interactive call always goes before queued
+# generation or bulk work; within a class it is first come, first served.
+PRIORITIES = {"interactive": 0, "generation": 1, "bulk": 2}
+
+
+class Scheduler:
+    """Caps concurrent calls and rate-limits starts with a token bucket.
+
+    ``rate_per_minute`` <= 0 disables the rate limit (only the concurrency
+    cap applies). ``burst`` is the bucket size. Both are per instance, which
+    means per uvicorn worker process.
+    """
+
+    def __init__(self, max_concurrency: int, rate_per_minute: float, burst: int):
+        self.max_concurrency = max_concurrency
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.running = 0
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._timer = None
+        self.classes = {
+            name: {"waiting": 0, "granted": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+            for name in PRIORITIES
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "generation"):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: str):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (PRIORITIES[priority], next(self._seq), time.monotonic(), priority, future))
+        self.classes[priority]["waiting"] += 1
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted just as we were cancelled
+            else:
+                self.classes[priority]["waiting"] -= 1
+                future.cancel()
+            raise
+
+    def release(self):
+        self.running -= 1
+        self._dispatch()
+
+    def _available(self, now: float) -> float:
+        if self.rate <= 0:
+            return float(self.capacity)
+        return min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = self._available(now)
+        self._updated = now
+
+    def _dispatch(self):
+        self._refill()
+        while self._waiters and self.running < self.max_concurrency:
+            _, _, enqueued, priority, future = self._waiters[0]
+            if future.done():  # cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if self.rate > 0:
+                if self.tokens < 1:
+                    self._wake_later((1 - self.tokens) / self.rate)
+                    return
+                self.tokens -= 1
+            heapq.heappop(self._waiters)
+            self.running += 1
+
+            waited = time.monotonic() - enqueued
+            stats = self.classes[priority]
+            stats["waiting"] -= 1
+            stats["granted"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+            future.set_result(None)
+
+    def _wake_later(self, delay: float):
+        if self._timer is not None and not self._timer.cancelled():
+            return
+        loop = asyncio.get_running_loop()
+
+        def wake():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = loop.call_later(delay, wake)
+
+    def stats(self) -> dict:
+        """Read-only snapshot; safe to call from threadpool endpoints."""
+        classes = {}
+        for name, stats in self.classes.items():
+            granted = stats["granted"]
+            classes[name] = dict(
+                stats,
+                wait_seconds_avg=round(stats["wait_seconds_total"] / granted, 4) if granted else 0.0,
+            )
+        return {
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "tokens": round(self._available(time.monotonic()), 2),
+            "rate_per_minute": self.rate * 60,
+            "classes": classes,
+        }
@@ -0,0 +1,34 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional: plain json produces the same bytes, just slower
+    orjson = None
+
+
+# ---------------------------------------------------------
+# QUESTION JSON
+# ---------------------------------------------------------
+
+def serialize_question(q) -> dict:
+    """API shape of one question; ``q`` is a Question or a row dict with its column names."""
+    get = q.get if isinstance(q, dict) else q.__getattribute__
+    return {
+        "id": get("id"),
+        "type": get("question_type"),
+        "question": get("question_text"),
+        "choices": {
+            "a": get("option1"),
+            "b": get("option2"),
+            "c": get("option3"),
+            "d": get("option4"),
+        } if get("question_type") == "mcq" else None,
+        "correct_option": get("correct_option"),
+        "answer": get("answer_text")
+    }
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
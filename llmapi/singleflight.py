@@ -0,0 +1,72 @@
+import asyncio
+import hashlib
+import json
+
+
+# ---------------------------------------------------------
+# SINGLE-FLIGHT COALESCING OF IDENTICAL CALLS
+# ---------------------------------------------------------
+
+def request_key(**payload) -> str:
+    """Hash a request payload so equivalent requests get the same key.
+
+    Strings anywhere in the payload are whitespace-normalized, so prompts
+    that differ only in spacing or trailing newlines coalesce.
+    """
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return value
+
+    raw = json.dumps(normalize(payload), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Concurrent ``run`` calls with the same key share one execution.
+
+    The first caller starts the call, later callers wait on the same task and
+    receive its result (or exception). The call is cancelled only when every
+    caller waiting on it has gone away.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}  # key -> [task, number of waiting callers]
+
+    async def run(self, key: str, factory):
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(factory())
+            flight = self._flights[key] = [task, 0]
+            task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        flight[1] += 1
+        try:
+            return await asyncio.shield(flight[0])
+        except asyncio.CancelledError:
+            if not flight[0].done() and flight[1] == 1:
+                flight[0].cancel()
+            raise
+        finally:
+            flight[1] -= 1
+
+    def _forget(self, key: str, task):
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] is task:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
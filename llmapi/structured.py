@@ -0,0 +1,164 @@
+import json
+from typing import Literal
+from pydantic import BaseModel, Field, ValidationError
+import config
+import llm
+
+
+# ---------------------------------------------------------
+# STRUCTURED (JSON) GENERATION WITH TARGETED REPAIR
+# ---------------------------------------------------------
+
+class MCQOptions(BaseModel):
+    a: str = Field(..., min_length=1)
+    b: str = Field(..., min_length=1)
+    c: str = Field(..., min_length=1)
+    d: str = Field(..., min_length=1)
+
+
+class GeneratedMCQ(BaseModel):
+    question: str = Field(..., min_length=1)
+    options: MCQOptions
+    correct_option: Literal["a", "b", "c", "d"]
+
+
+class GeneratedShort(BaseModel):
+    question: str = Field(..., min_length=1)
+    sample_answer: str = Field(..., min_length=1)
+
+
+SCHEMAS = {"mcq": GeneratedMCQ, "short": GeneratedShort}
+
+STRUCTURED_PROMPT = """Generate exactly 5 multiple-choice questions and 5 short questions about the text below.
+
+Return ONLY a JSON object of this shape:
+{{"mcqs": [{{"question": "...", "options": {{"a": "...", "b": "...", "c": "...", "d": "..."}}, "correct_option": "a"}}],
+  "shorts": [{{"question": "...", "sample_answer": "..."}}]}}
+
+{text}"""
+
+REPAIR_PROMPT = """These generated quiz items failed validation.
+Fix only what the error describes and keep the content otherwise unchanged.
+MCQ items need "question", "options" with non-empty "a"-"d" and "correct_option" as one of "a"-"d".
+Short items need non-empty "question" and "sample_answer".
+
+Return ONLY a JSON object {{"items": [{{"id": <same id>, ...fixed item fields}}]}}.
+
+{items}"""
+
+SYNTAX_REPAIR_PROMPT = """The following should be a JSON object with "mcqs" and "shorts" lists but is not valid JSON.
+Return ONLY the corrected JSON object, changing nothing but the syntax.
+
+{output}"""
+
+
+def _validate(kind: str, item):
+    """Return (question dict, None) if ``item`` matches the schema, else (None, error)."""
+    if not isinstance(item, dict):
+        return None, "item is not a JSON object"
+    if isinstance(item.get("correct_option"), str):
+        item = dict(item, correct_option=item["correct_option"].strip().lower()[:1])
+    try:
+        parsed = SCHEMAS[kind](**item)
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+    if kind == "mcq":
+        return {
+            "type": "mcq",
+            "question": parsed.question.strip(),
+            "choices": {letter: getattr(parsed.options, letter).strip() for letter in "abcd"},
+            "correct_option": parsed.correct_option,
+        }, None
+    return {"type": "short", "question": parsed.question.strip(), "answer": parsed.sample_answer.strip()}, None
+
+
+async def _complete_json(prompt: str) -> str:
+    return await llm.chat_completion(
+        model=config.GENERATION_MODEL,
+        messages=[
+            {"role": "system", "content": "You are a helpful education assistant. You answer in JSON."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.7,
+        json_mode=True,
+    )
+
+
+async def generate_structured(text: str) -> dict:
+    """Generate questions as JSON and repair only the items that fail validation.
+
+    Returns the same shape as ``parsers.parse_questions`` plus the raw
+    ``output`` and the number of ``repairs`` requests sent.
+    """
+    output = await _complete_json(STRUCTURED_PROMPT.format(text=text))
+    repairs = 0
+
+    data = None
+    while data is None:
+        try:
+            data = json.loads(output)
+            if not isinstance(data, dict):
+                raise ValueError("top level is not an object")
+        except ValueError:
+            data = None
+            if repairs >= config.GENERATION_REPAIR_ATTEMPTS:
+                return {"mcqs": [], "shorts": [], "output": output, "repairs": repairs,
+                        "errors": [{"number": 0, "error": "response is not valid JSON"}]}
+            repairs += 1
+            output = await _complete_json(SYNTAX_REPAIR_PROMPT.format(output=output))
+
+    # id → (kind, raw item); ids are stable across repair rounds
+    items = {}
+    for kind, key in (("mcq", "mcqs"), ("short", "shorts")):
+        raw_items = data.get(key)
+        for item in raw_items if isinstance(raw_items, list) else []:
+            items[len(items) + 1] = (kind, item)
+
+    valid = {}
+    broken = {}
+    for item_id, (kind, item) in items.items():
+        question, error = _validate(kind, item)
+        if question:
+            valid[item_id] = question
+        else:
+            broken[item_id] = error
+
+    while broken and repairs < config.GENERATION_REPAIR_ATTEMPTS:
+        repairs += 1
+        request = [
+            {"id": item_id, "kind": items[item_id][0], "error": error, "item": items[item_id][1]}
+            for item_id, error in broken.items()
+        ]
+        try:
+            fixed = json.loads(await _complete_json(REPAIR_PROMPT.format(items=json.dumps(request, ensure_ascii=False))))
+            fixed = fixed.get("items", []) if isinstance(fixed, dict) else []
+        except ValueError:
+            continue
+
+        for item in fixed:
+            item_id = item.get("id") if isinstance(item, dict) else None
+            if item_id not in broken:
+                continue
+            kind = items[item_id][0]
+            item = {k: v for k, v in item.items() if k not in ("id", "kind")}
+            items[item_id] = (kind, item)
+            question, error = _validate(kind, item)
+            if question:
+                valid[item_id] = question
+                del broken[item_id]
+            else:
+                broken[item_id] = error
+
+    mcqs = [valid[i] for i in sorted(valid) if valid[i]["type"] == "mcq"]
+    shorts = [valid[i] for i in sorted(valid) if valid[i]["type"] == "short"]
+    for number, q in enumerate(mcqs, start=1):
+        q["question"] = f"{number}. {q['question']}"
+
+    return {
+        "mcqs": mcqs,
+        "shorts": shorts,
+        "errors": [{"number": item_id, "error": error} for item_id, error in broken.items()],
+        "output": output,
+        "repairs": repairs,
+    }
@@ -0,0 +1,4 @@
+import os
+
+# Tests that import main must not migrate or write the real qnabase.db
+os.environ.setdefault("DATABASE_URL", "sqlite://")
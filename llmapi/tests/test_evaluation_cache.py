@@ -0,0 +1,27 @@
+import unittest
+from main import EvalRequest, evaluation_cache_key, normalize_answer
+
+
+class NormalizeAnswerTests(unittest.TestCase):
+    def test_numbers_keep_sign_and_separators(self):
+        for a, b in [("3.5 m/s", "35 ms"), ("-5", "5"), ("1/2", "12"), ("1,000", "1000")]:
+            self.assertNotEqual(normalize_answer(a), normalize_answer(b), (a, b))
+
+    def test_formatting_differences_still_match(self):
+        for a, b in [
+            ("Photosynthesis!", "photosynthesis"),
+            ("The answer is 5.", "the answer is 5"),
+            ("It is, well,  light", "it is well light"),
+        ]:
+            self.assertEqual(normalize_answer(a), normalize_answer(b), (a, b))
+
+    def test_cache_key_follows_normalized_answer(self):
+        def key(student):
+            return evaluation_cache_key(EvalRequest(prompt="Speed?", expected="3.5 m/s", student=student))
+
+        self.assertNotEqual(key("3.5 m/s"), key("35 ms"))
+        self.assertEqual(key("3.5 m/s"), key("3.5 M/S!"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Run from the llmapi directory: python -m unittest"""
+import time
+import unittest
+from benchmarks.bench_parser import build_corpus, mcq, short
+from parsers import parse_questions
+
+
+class ParseQuestionsTests(unittest.TestCase):
+    def setUp(self):
+        self.corpus = build_corpus()
+
+    def assertCounts(self, name, mcqs, shorts, errors=0):
+        result = parse_questions(self.corpus[name])
+        self.assertEqual(
+            (len(result["mcqs"]), len(result["shorts"]), len(result["errors"])),
+            (mcqs, shorts, errors),
+            name,
+        )
+        return result
+
+    def test_typical_output(self):
+        result = self.assertCounts("typical (5+5)", 5, 5)
+        self.assertEqual(result["mcqs"][0], {
+            "type": "mcq",
+            "question": "1. Which process converts light energy into chemical energy in plants?",
+            "choices": {"a": "Respiration", "b": "Photosynthesis", "c": "Transpiration", "d": "Digestion"},
+            "correct_option": "b",
+        })
+        self.assertEqual(result["shorts"][0], {
+            "type": "short",
+            "question": "Explain the role of chlorophyll in photosynthesis.",
+            "answer": "Chlorophyll absorbs light (mostly red and blue) and starts the light reactions.",
+        })
+
+    def test_markdown_bold(self):
+        self.assertCounts("markdown bold", 5, 5)
+
+    def test_inline_options(self):
+        result = self.assertCounts("inline options", 5, 5)
+        self.assertEqual(result["mcqs"][0]["choices"]["d"], "Digestion")
+
+    def test_many_questions(self):
+        self.assertCounts("50 + 50 questions", 50, 50)
+
+    def test_short_numbering_not_fixed_to_6_10(self):
+        self.assertCounts("short numbering 11-15", 5, 5)
+
+    def test_missing_correct_answers_are_reported(self):
+        for n in (6, 10, 12):
+            result = self.assertCounts(f"no answers, {n} questions", 0, 0, errors=n)
+            self.assertEqual(
+                result["errors"],
+                [{"number": i, "error": "missing correct answer"} for i in range(1, n + 1)],
+            )
+
+    def test_unclosed_sample_answer_is_linear(self):
+        started = time.perf_counter()
+        result = self.assertCounts("unclosed sample, 2000 lines", 0, 1)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertTrue(result["shorts"][0]["answer"].startswith("the capacity to do work"))
+
+    def test_missing_options(self):
+        text = "1. Which one?\na) x\nb) y\nCorrect answer: a\n"
+        self.assertEqual(parse_questions(text)["errors"], [{"number": 1, "error": "missing option(s) c, d"}])
+
+    def test_empty_sample_answer(self):
+        result = parse_questions("6. Define energy. (Sample answer: )\n")
+        self.assertEqual(result["errors"], [{"number": 6, "error": "empty sample answer"}])
+
+    def test_item_without_options_or_answer(self):
+        result = parse_questions(mcq(1) + "2. Describe osmosis.\n" + short(3))
+        self.assertEqual((len(result["mcqs"]), len(result["shorts"])), (1, 1))
+        self.assertEqual(result["errors"], [{"number": 2, "error": "no options or sample answer"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import time
+import unittest
+from scheduler import Scheduler
+
+
+class SchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def hold(self, scheduler, priority="generation"):
+        await scheduler.acquire(priority)
+
+    async def test_higher_priority_goes_first(self):
+        scheduler = Scheduler(max_concurrency=1, rate_per_minute=0, burst=1)
+        await self.hold(scheduler)
+        order = []
+
+        async def call(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        tasks = []
+        for name, priority in [("bulk-1", "bulk"), ("gen-1", "generation"), ("bulk-2", "bulk"),
+                               ("inter-1", "interactive"), ("gen-2", "generation"), ("inter-2", "interactive")]:
+            tasks.append(asyncio.create_task(call(name, priority)))
+            await asyncio.sleep(0)
+        self.assertEqual(scheduler.stats()["classes"]["bulk"]["waiting"], 2)
+
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        # By class first, then first come, first served within a class
+        self.assertEqual(order, ["inter-1", "inter-2", "gen-1", "gen-2", "bulk-1", "bulk-2"])
+        self.assertEqual(scheduler.running, 0)
+
+    async def test_concurrency_cap(self):
+        scheduler = Scheduler(max_concurrency=2, rate_per_minute=0, burst=1)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with scheduler.slot("bulk"):
+                peak = max(peak, scheduler.running)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(scheduler.stats()["classes"]["bulk"]["granted"], 6)
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = Scheduler(max_concurrency=1, rate_per_minute=0, burst=1)
+        await self.hold(scheduler)
+        waiter = asyncio.create_task(scheduler.acquire("interactive"))
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.stats()["classes"]["interactive"]["waiting"], 1)
+
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(scheduler.stats()["classes"]["interactive"]["waiting"], 0)
+
+        # The slot goes to the next live waiter, not the cancelled one
+        scheduler.release()
+        await asyncio.wait_for(scheduler.acquire("bulk"), 1)
+        self.assertEqual(scheduler.running, 1)
+        self.assertEqual(scheduler.stats()["classes"]["interactive"]["granted"], 0)
+
+    async def test_cancel_right_after_grant_returns_the_slot(self):
+        scheduler = Scheduler(max_concurrency=1, rate_per_minute=0, burst=1)
+        await self.hold(scheduler)
+        waiter = asyncio.create_task(scheduler.acquire("interactive"))
+        await asyncio.sleep(0)
+
+        scheduler.release()  # grants the waiter before it gets to run
+        self.assertEqual(scheduler.running, 1)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(scheduler.running, 0)
+
+    async def test_unknown_priority(self):
+        scheduler = Scheduler(max_concurrency=1, rate_per_minute=0, burst=1)
+        with self.assertRaises(ValueError):
+            await scheduler.acquire("urgent")
+
+    async def test_token_bucket_spaces_out_starts(self):
+        scheduler = Scheduler(max_concurrency=10, rate_per_minute=600, burst=1)  # one start per 0.1 s
+        started = time.monotonic()
+        for _ in range(3):
+            async with scheduler.slot("bulk"):
+                pass
+        self.assertGreaterEqual(time.monotonic() - started, 0.18)
+
+    async def test_stats_do_not_change_the_bucket(self):
+        scheduler = Scheduler(max_concurrency=10, rate_per_minute=600, burst=2)
+        async with scheduler.slot("bulk"):
+            pass
+        tokens, updated = scheduler.tokens, scheduler._updated
+        await asyncio.sleep(0.05)
+        self.assertGreater(scheduler.stats()["tokens"], tokens)
+        self.assertEqual((scheduler.tokens, scheduler._updated), (tokens, updated))
+
+
+if __name__ == "__main__":
+    unittest.main()
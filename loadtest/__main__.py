@@ -0,0 +1,72 @@
+"""End-to-end load test of the portal and llmapi.
+
+1. Start llmapi with the offline stub so no tokens are spent:
+
+    cd llmapi && LLM_PROVIDER=stub uvicorn main:app --port 8001 --workers 4
+
+2. Start the portal and seed synthetic courses, users and AI tests:
+
+    python manage.py seed_loadtest --courses 5 --students-per-course 100 --clear-submissions
+
+3. Run the scenarios (all by default, in exam order) from the repository root:
+
+    python -m loadtest --manifest loadtest-manifest.json --concurrency 100 --output run.json
+
+Each scenario prints requests, errors, throughput and p50/p95/p99 per
+endpoint. ``--baseline previous.json`` compares against an earlier
+``--output`` and exits with status 1 when any p95 grew by more than
+``--tolerance`` or new errors appeared. Re-seed with --clear-submissions
+before repeating a run, since a student can submit each test only once.
+"""
+import argparse
+import json
+import sys
+from loadtest.report import Recorder, compare, print_table
+from loadtest.scenarios import DEFAULT_ORDER, SCENARIOS, Context
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Portal + llmapi load test")
+    parser.add_argument("--manifest", default="loadtest-manifest.json", help="Written by manage.py seed_loadtest")
+    parser.add_argument("--portal", default="http://127.0.0.1:8000")
+    parser.add_argument("--llmapi", default="http://127.0.0.1:8001")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Run only these scenarios (repeatable); default runs them all in exam order")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the per-scenario summary as JSON")
+    parser.add_argument("--baseline", help="Earlier --output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth against the baseline")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    sessions = {}
+    results = {}
+    for name in args.scenario or DEFAULT_ORDER:
+        recorder = Recorder()
+        ctx = Context(manifest, args.portal, args.llmapi, args.concurrency, recorder, seed=args.seed)
+        ctx.sessions = sessions  # logins carry over between scenarios
+        SCENARIOS[name](ctx)
+        recorder.stop()
+        results[name] = recorder.summary()
+        print_table(name, results[name], recorder.finished - recorder.started)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against", args.baseline)
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("\nNo regressions against", args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
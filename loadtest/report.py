@@ -0,0 +1,82 @@
+import json
+import math
+import threading
+import time
+
+
+# ---------------------------------------------------------
+# LATENCY RECORDING AND REPORTING
+# ---------------------------------------------------------
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Thread-safe collector of (endpoint, seconds, ok) samples."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def add(self, endpoint: str, seconds: float, ok: bool):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def summary(self) -> dict:
+        wall = (self.finished or time.perf_counter()) - self.started
+        result = {}
+        for endpoint, values in sorted(self.samples.items()):
+            values = sorted(values)
+            result[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput_rps": round(len(values) / wall, 2) if wall else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+            }
+        return result
+
+
+def print_table(scenario: str, summary: dict, wall_seconds: float):
+    print(f"\n{scenario}  ({wall_seconds:.1f} s)")
+    print(f"{'endpoint':<44} {'reqs':>6} {'errs':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, row in summary.items():
+        print(f"{endpoint:<44} {row['requests']:>6} {row['errors']:>5} {row['throughput_rps']:>8} "
+              f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['max_ms']:>9}")
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> list:
+    """Return regressions of ``results`` against a previously saved run.
+
+    An endpoint regresses when its p95 grows by more than ``tolerance``
+    (0.2 = 20 %), or when it reports errors the baseline did not have.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for scenario, endpoints in results.items():
+        for endpoint, row in endpoints.items():
+            before = baseline.get(scenario, {}).get(endpoint)
+            if before is None:
+                continue
+            if before["p95_ms"] and row["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{scenario} {endpoint}: p95 {before['p95_ms']} → {row['p95_ms']} ms")
+            if row["errors"] > before["errors"]:
+                regressions.append(f"{scenario} {endpoint}: errors {before['errors']} → {row['errors']}")
+    return regressions
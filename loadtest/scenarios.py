@@ -0,0 +1,194 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+
+# ---------------------------------------------------------
+# LOAD-TEST SCENARIOS
+# ---------------------------------------------------------
+#
+# Every scenario drives the running portal (Django) and llmapi (FastAPI)
+# over HTTP exactly like browsers and the portal do, and records one sample
+# per request under a route template such as "GET /ai-test/{qna_id}/solve/".
+
+class Context:
+    def __init__(self, manifest: dict, portal: str, llmapi: str, concurrency: int, recorder, seed: int = 0):
+        self.manifest = manifest
+        self.portal = portal.rstrip("/")
+        self.llmapi = llmapi.rstrip("/")
+        self.concurrency = concurrency
+        self.recorder = recorder
+        self.rng = random.Random(seed)
+        self.sessions = {}
+        self._questions = {}
+
+    def timed(self, endpoint: str, call, expect=(200,)):
+        started = time.perf_counter()
+        try:
+            response = call()
+            ok = response.status_code in expect
+        except requests.RequestException:
+            response, ok = None, False
+        self.recorder.add(endpoint, time.perf_counter() - started, ok)
+        return response if ok else None
+
+    def fan_out(self, work, items):
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(work, items))
+
+    def session(self, username: str):
+        """Logged-in session for ``username`` (logs in on first use)."""
+        session = self.sessions.get(username)
+        if session is not None:
+            return session
+        session = requests.Session()
+        self.timed("GET /login/", lambda: session.get(f"{self.portal}/login/"))
+        self.timed("POST /login/", lambda: session.post(
+            f"{self.portal}/login/",
+            data={
+                "username": username,
+                "password": self.manifest["password"],
+                "csrfmiddlewaretoken": session.cookies.get("csrftoken", ""),
+            },
+            headers={"Referer": f"{self.portal}/login/"},
+            allow_redirects=False,
+        ), expect=(302,))
+        self.sessions[username] = session
+        return session
+
+    def questions(self, qna_id: int) -> list:
+        if qna_id not in self._questions:
+            self._questions[qna_id] = requests.get(f"{self.llmapi}/questions/{qna_id}").json()
+        return self._questions[qna_id]
+
+
+def login(ctx: Context):
+    """Every student signs in at once."""
+    ctx.fan_out(lambda s: ctx.session(s["username"]), ctx.manifest["students"])
+
+
+def exam_start(ctx: Context):
+    """All students open their first AI test at the same moment."""
+    def open_test(student):
+        session = ctx.session(student["username"])
+        qna_id = student["qna_ids"][0]
+        ctx.timed("GET /ai-test/{qna_id}/solve/",
+                  lambda: session.get(f"{ctx.portal}/ai-test/{qna_id}/solve/", allow_redirects=False))
+
+    ctx.fan_out(open_test, ctx.manifest["students"])
+
+
+def _answers(ctx: Context, questions: list) -> dict:
+    form = {}
+    for index, q in enumerate(questions):
+        if q["type"] == "mcq":
+            form[f"q_{index}"] = ctx.rng.choice("abcd")
+        else:
+            words = (q.get("answer") or "I am not sure").split()
+            keep = ctx.rng.randint(1, len(words))
+            form[f"q_{index}"] = " ".join(words[:keep])
+    return form
+
+
+def mass_submission(ctx: Context):
+    """The whole class submits the first AI test together."""
+    forms = {}
+    for student in ctx.manifest["students"]:
+        qna_id = student["qna_ids"][0]
+        forms[student["username"]] = (qna_id, _answers(ctx, ctx.questions(qna_id)))
+
+    def submit(student):
+        session = ctx.session(student["username"])
+        qna_id, form = forms[student["username"]]
+        url = f"{ctx.portal}/ai-test/{qna_id}/solve/"
+        ctx.timed("POST /ai-test/{qna_id}/solve/", lambda: session.post(
+            url,
+            data=dict(form, csrfmiddlewaretoken=session.cookies.get("csrftoken", "")),
+            headers={"Referer": url},
+            allow_redirects=False,
+        ), expect=(302,))
+
+    ctx.fan_out(submit, ctx.manifest["students"])
+
+
+def results(ctx: Context):
+    """Students open their result page (short answers are graded by the task worker)."""
+    def view(student):
+        session = ctx.session(student["username"])
+        qna_id = student["qna_ids"][0]
+        ctx.timed("GET /ai-test/{qna_id}/result/",
+                  lambda: session.get(f"{ctx.portal}/ai-test/{qna_id}/result/", allow_redirects=False))
+
+    ctx.fan_out(view, ctx.manifest["students"])
+
+
+def bulk_grading(ctx: Context, batch_size: int = 200, batches: int = 10):
+    """Raw batch grading traffic against llmapi, as `manage.py grade_descriptive_answers` sends it."""
+    teacher = ctx.session(ctx.manifest["teachers"][0])
+    ctx.timed("POST /run-evaluation/", lambda: teacher.post(
+        f"{ctx.portal}/run-evaluation/",
+        data={"csrfmiddlewaretoken": teacher.cookies.get("csrftoken", "")},
+        headers={"Referer": f"{ctx.portal}/run-evaluation/"},
+    ))
+
+    shorts = [q for test in ctx.manifest["tests"] for q in ctx.questions(test["qna_id"]) if q["type"] == "short"]
+    if not shorts:
+        return
+    payloads = []
+    for _ in range(batches):
+        items = []
+        for _ in range(batch_size):
+            q = ctx.rng.choice(shorts)
+            words = q["answer"].split()
+            items.append({
+                "prompt": q["question"],
+                "expected": q["answer"],
+                "student": " ".join(ctx.rng.sample(words, ctx.rng.randint(1, len(words)))),
+            })
+        payloads.append({"priority": "bulk", "items": items})
+
+    ctx.fan_out(lambda payload: ctx.timed(
+        "POST /evaluate-answers/batch",
+        lambda: requests.post(f"{ctx.llmapi}/evaluate-answers/batch", json=payload, timeout=3600),
+    ), payloads)
+
+
+def llmapi_reads(ctx: Context, reads_per_test: int = 200):
+    """Question-set reads as the portal issues them, single and batched."""
+    qna_ids = [test["qna_id"] for test in ctx.manifest["tests"]]
+    singles = [qna_id for qna_id in qna_ids for _ in range(reads_per_test)]
+    ctx.rng.shuffle(singles)
+    ctx.fan_out(lambda qna_id: ctx.timed(
+        "GET /questions/{qna_id}", lambda: requests.get(f"{ctx.llmapi}/questions/{qna_id}"),
+    ), singles)
+
+    ids = ",".join(str(qna_id) for qna_id in qna_ids)
+    ctx.fan_out(lambda _: ctx.timed(
+        "GET /questions?ids=", lambda: requests.get(f"{ctx.llmapi}/questions", params={"ids": ids}),
+    ), range(reads_per_test))
+
+
+def teacher_review(ctx: Context):
+    """Each teacher opens the generated tests of their course."""
+    def review(test):
+        session = ctx.session(test["teacher"])
+        ctx.timed("GET /view-generated-test/{doc_id}/", lambda: session.get(
+            f"{ctx.portal}/view-generated-test/{test['doc_id']}/", allow_redirects=False, timeout=600,
+        ))
+
+    ctx.fan_out(review, ctx.manifest["tests"])
+
+
+SCENARIOS = {
+    "login": login,
+    "exam_start": exam_start,
+    "mass_submission": mass_submission,
+    "results": results,
+    "bulk_grading": bulk_grading,
+    "llmapi_reads": llmapi_reads,
+    "teacher_review": teacher_review,
+}
+
+# The order of a real exam: sign in, open, submit, check results, then re-grade
+DEFAULT_ORDER = ["login", "exam_start", "mass_submission", "results", "bulk_grading", "llmapi_reads"]
@@ -0,0 +1,64 @@
+"""Test generation for uploaded .docx files (TestSourceDocument) through llmapi jobs."""
+from . import llmapi_client, question_mirror
+
+
+def start_generation(doc, force=False):
+    """Send ``doc``'s .docx to llmapi as a background job → "queued", "done" or "failed".
+
+    Job mode: llmapi answers with a job id straight away and the
+    poll_generation task (or the generated-test page) picks up the qna_id once
+    generation finishes. ``force`` skips llmapi's generation cache, which
+    is what an explicit regenerate wants. The current qna_id stays in place
+    until the new set is ready.
+    """
+    params = {"job": "true"}
+    if force:
+        params["force"] = "true"
+    with open(doc.uploaded_file.path, "rb") as f:
+        res = llmapi_client.post("/generate-questions/", "generate", params=params, files={"file": f})
+
+    if res.status_code == 202:
+        doc.generation_job_id = res.json().get("job_id")
+        doc.generation_error = None
+        doc.save()
+        return "queued"
+    if res.status_code == 200:
+        doc.qna_id = res.json().get("saved_id")
+        doc.generation_error = None
+        doc.save()
+        question_mirror.import_question_sets([doc.qna_id])
+        return "done"
+    return "failed"
+
+
+def refresh_generation_jobs(test_docs):
+    for doc in test_docs.filter(generation_job_id__isnull=False):
+        try:
+            res = llmapi_client.get(f"/jobs/{doc.generation_job_id}", "jobs")
+        except Exception:
+            continue
+
+        if res.status_code == 404:
+            # Jobs live in the llmapi database, so 404 means it was pruned or the database reset
+            doc.generation_job_id = None
+            doc.generation_error = "Generation job was lost, please regenerate."
+            doc.save()
+            continue
+        if res.status_code != 200:
+            continue  # llmapi error or a proxy page; try again on the next poll
+
+        try:
+            job = res.json()
+        except ValueError:
+            continue
+
+        if job.get("status") == "done":
+            doc.qna_id = job.get("saved_id")
+            doc.generation_job_id = None
+            doc.generation_error = None
+            doc.save()
+            question_mirror.import_question_sets([doc.qna_id])
+        elif job.get("status") == "failed":
+            doc.generation_job_id = None
+            doc.generation_error = job.get("error") or "Generation failed."
+            doc.save()
@@ -0,0 +1,93 @@
+"""Grading of descriptive AI-test answers through llmapi.
+
+Shared by the grade_submission task (one student, interactive priority) and the
+``grade_descriptive_answers`` command (everyone, bulk priority).
+"""
+from django.db import transaction
+from . import llmapi_client, question_mirror
+from .models import AIStudentAnswer
+
+EVALUATION_BATCH_SIZE = 200
+
+
+def evaluate_descriptive_answers(items, priority="bulk"):
+    """Grade many (question, expected, student) tuples through /evaluate-answers/batch.
+
+    Returns one (score, feedback) pair per item, in order. Items the service
+    could not grade come back as (None, None) so they are retried later.
+    Use priority="interactive" when a student is waiting on the result page.
+    """
+    results = []
+    for start in range(0, len(items), EVALUATION_BATCH_SIZE):
+        chunk = items[start:start + EVALUATION_BATCH_SIZE]
+        payload = {"priority": priority, "items": [
+            {"prompt": question, "expected": expected, "student": student}
+            for question, expected, student in chunk
+        ]}
+        try:
+            res = llmapi_client.post("/evaluate-answers/batch", "evaluate_batch", json=payload)
+            if res.status_code != 200:
+                results.extend([(None, None)] * len(chunk))
+                continue
+            for item in res.json()["results"]:
+                if item.get("ok"):
+                    results.append((item.get("score", 0.0), item.get("feedback", "")))
+                else:
+                    results.append((None, None))
+        except Exception as e:
+            print(f"Error evaluating answers: {e}")
+            results.extend([(None, None)] * len(chunk))
+    return results
+
+
+def ungraded_answers():
+    """Descriptive answers that still need a score."""
+    return (
+        AIStudentAnswer.objects
+        .filter(descriptive_answer__isnull=False, score__isnull=True)
+        .exclude(descriptive_answer__exact='')
+    )
+
+
+def model_answers(qna_ids):
+    """{qna_id: {question text: sample answer}}, one mirror lookup for all sets."""
+    question_sets = question_mirror.get_question_sets(sorted(set(qna_ids))) if qna_ids else {}
+    return {
+        qna_id: {q["question"]: q.get("answer") or "" for q in questions if q["type"] == "short"}
+        for qna_id, questions in question_sets.items()
+    }
+
+
+def grade_answers(answers, priority="bulk", expected=None):
+    """Grade ``answers`` and save the scores in one transaction.
+
+    ``expected`` is a model_answers() mapping covering the answers' sets
+    (looked up when omitted). Returns (graded, failed, skipped): skipped
+    answers have no matching sample answer, failed ones are left unscored
+    so a later run retries them.
+    """
+    if expected is None:
+        expected = model_answers({ans.qna_id for ans in answers})
+
+    pending = []
+    for ans in answers:
+        model_answer = expected.get(ans.qna_id, {}).get(ans.question_text)
+        if model_answer:
+            pending.append((ans, model_answer))
+    skipped = len(answers) - len(pending)
+
+    results = evaluate_descriptive_answers([
+        (ans.question_text, model_answer, ans.descriptive_answer) for ans, model_answer in pending
+    ], priority=priority)
+
+    graded = []
+    for (ans, _), (score, feedback) in zip(pending, results):
+        if score is None:
+            continue
+        ans.score = score
+        ans.feedback = feedback
+        graded.append(ans)
+    with transaction.atomic():
+        AIStudentAnswer.objects.bulk_update(graded, ['score', 'feedback'])
+
+    return len(graded), len(pending) - len(graded), skipped
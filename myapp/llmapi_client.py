@@ -0,0 +1,152 @@
+"""Shared HTTP client for calls from the portal to the llmapi service.
+
+All views talk to llmapi through ``get`` / ``post`` here, so they share one
+keep-alive connection pool, get a connect + read timeout per endpoint and
+retry idempotent GETs with backoff.
+
+Settings (Django settings first, then environment variables):
+
+    LLMAPI_URL        http://127.0.0.1:8001, or unix:///path/to/llmapi.sock
+                      when uvicorn runs with --uds on the same host
+    LLMAPI_POOL_SIZE  keep-alive connections kept per host (default 20)
+    LLMAPI_RETRIES    retries for GETs on connection errors / 502-504 (default 2)
+    LLMAPI_TIMEOUTS   dict overriding entries of DEFAULT_TIMEOUTS
+"""
+import os
+import socket
+import threading
+from urllib.parse import unquote
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.util.retry import Retry
+
+
+# (connect, read) seconds per endpoint group
+DEFAULT_TIMEOUTS = {
+    "default": (3.05, 30),
+    "questions": (3.05, 10),
+    "jobs": (3.05, 5),
+    "generate": (3.05, 300),
+    "evaluate": (3.05, 60),
+    "evaluate_batch": (3.05, 600),
+}
+
+UNIX_HOST = "http://llmapi.sock"
+
+
+def _setting(name, default):
+    value = getattr(settings, name, None)
+    if value is not None:
+        return value
+    return os.getenv(name, default)
+
+
+# ---------------------------------------------------------
+# UNIX-DOMAIN-SOCKET TRANSPORT
+# ---------------------------------------------------------
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, *args, socket_path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class _UnixConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _UnixHTTPConnection
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """Sends every request it is mounted for to one Unix socket."""
+
+    def __init__(self, socket_path, pool_maxsize=10, **kwargs):
+        self.socket_path = socket_path
+        self._unix_pool = None
+        self._unix_pool_maxsize = pool_maxsize
+        super().__init__(pool_maxsize=pool_maxsize, **kwargs)
+
+    def _pool(self):
+        if self._unix_pool is None:
+            self._unix_pool = _UnixConnectionPool(
+                "localhost", maxsize=self._unix_pool_maxsize, socket_path=self.socket_path,
+            )
+        return self._unix_pool
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._pool()
+
+    def get_connection(self, url, proxies=None):
+        return self._pool()
+
+    def close(self):
+        super().close()
+        if self._unix_pool is not None:
+            self._unix_pool.close()
+
+
+# ---------------------------------------------------------
+# SHARED SESSION
+# ---------------------------------------------------------
+
+_session = None
+_base_url = None
+_lock = threading.Lock()
+
+
+def _build_session():
+    url = _setting("LLMAPI_URL", "http://127.0.0.1:8001").rstrip("/")
+    pool_size = int(_setting("LLMAPI_POOL_SIZE", 20))
+    retry = Retry(
+        total=int(_setting("LLMAPI_RETRIES", 2)),
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+
+    session = requests.Session()
+    if url.startswith("unix://"):
+        adapter = UnixSocketAdapter(unquote(url[len("unix://"):]), pool_maxsize=pool_size, max_retries=retry)
+        session.mount(UNIX_HOST + "/", adapter)
+        url = UNIX_HOST
+    else:
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session, url
+
+
+def session():
+    """The process-wide session and the base URL to prefix paths with."""
+    global _session, _base_url
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session, _base_url = _build_session()
+    return _session, _base_url
+
+
+def timeout_for(endpoint: str) -> tuple:
+    timeouts = dict(DEFAULT_TIMEOUTS, **(getattr(settings, "LLMAPI_TIMEOUTS", None) or {}))
+    return timeouts.get(endpoint, timeouts["default"])
+
+
+def get(path: str, endpoint: str = "default", **kwargs) -> requests.Response:
+    client, base_url = session()
+    kwargs.setdefault("timeout", timeout_for(endpoint))
+    return client.get(base_url + path, **kwargs)
+
+
+def post(path: str, endpoint: str = "default", **kwargs) -> requests.Response:
+    client, base_url = session()
+    kwargs.setdefault("timeout", timeout_for(endpoint))
+    return client.post(base_url + path, **kwargs)
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.core.management.base import BaseCommand
+from django.db import connections
+from myapp.grading import grade_answers, model_answers, ungraded_answers
+
+
+class Command(BaseCommand):
+    help = ("Grade all unscored descriptive AI-test answers. Work is grouped by test, sent to llmapi "
+            "from a bounded thread pool and committed per batch, so an interrupted run simply resumes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Batches graded concurrently")
+        parser.add_argument('--batch-size', type=int, default=100, help="Answers per llmapi request / commit")
+        parser.add_argument('--qna-id', type=int, action='append', dest='qna_ids', help="Only these tests (repeatable)")
+        parser.add_argument('--limit', type=int, default=0, help="Stop after this many answers (0 = all)")
+        parser.add_argument('--priority', default='bulk', choices=['interactive', 'generation', 'bulk'])
+        parser.add_argument('--progress-every', type=float, default=5.0, help="Seconds between progress lines")
+
+    def handle(self, *args, **options):
+        answers = ungraded_answers()
+        if options['qna_ids']:
+            answers = answers.filter(qna_id__in=options['qna_ids'])
+        total = answers.count()
+        if options['limit']:
+            total = min(total, options['limit'])
+        if not total:
+            self.stdout.write("Nothing to grade.")
+            return
+
+        qna_ids = sorted(answers.values_list('qna_id', flat=True).distinct())
+        self.stdout.write(f"Grading {total} answers from {len(qna_ids)} tests "
+                          f"({options['workers']} workers, batches of {options['batch_size']})")
+
+        def batches():
+            # Keyset pagination per test: each question set is read once, and
+            # answers that fail in this run are not picked up again until the next one
+            scheduled = 0
+            for qna_id in qna_ids:
+                expected = model_answers([qna_id])
+                last_id = 0
+                while True:
+                    size = options['batch_size']
+                    if options['limit']:
+                        size = min(size, options['limit'] - scheduled)
+                        if size <= 0:
+                            return
+                    page = list(answers.filter(qna_id=qna_id, id__gt=last_id).order_by('id')[:size])
+                    if not page:
+                        break
+                    last_id = page[-1].id
+                    scheduled += len(page)
+                    yield page, expected
+
+        def work(page, expected):
+            try:
+                return grade_answers(page, priority=options['priority'], expected=expected)
+            finally:
+                connections.close_all()  # this thread's connection only
+
+        counts = {"graded": 0, "failed": 0, "skipped": 0}
+        started = last_report = time.monotonic()
+
+        def account(done):
+            nonlocal last_report
+            for future in done:
+                graded, failed, skipped = future.result()
+                counts["graded"] += graded
+                counts["failed"] += failed
+                counts["skipped"] += skipped
+            now = time.monotonic()
+            if now - last_report >= options['progress_every']:
+                last_report = now
+                self._progress(counts, total, now - started)
+
+        pool = ThreadPoolExecutor(max_workers=options['workers'])
+        in_flight = set()
+        try:
+            for page, expected in batches():
+                in_flight.add(pool.submit(work, page, expected))
+                if len(in_flight) >= options['workers'] * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    account(done)
+            done, in_flight = wait(in_flight)
+            account(done)
+        except KeyboardInterrupt:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self._progress(counts, total, time.monotonic() - started)
+            self.stdout.write(self.style.WARNING("Interrupted. Finished batches are saved; run again to resume."))
+            return
+        pool.shutdown()
+
+        self._progress(counts, total, time.monotonic() - started)
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def _progress(self, counts, total, elapsed):
+        processed = counts["graded"] + counts["failed"] + counts["skipped"]
+        rate = processed / elapsed if elapsed else 0.0
+        eta = (total - processed) / rate if rate else 0.0
+        self.stdout.write(
+            f"{processed}/{total} processed: {counts['graded']} graded, {counts['failed']} failed, "
+            f"{counts['skipped']} without sample answer | {rate:.1f} answers/s, ETA {eta:.0f}s"
+        )
@@ -0,0 +1,44 @@
+import os
+import socket
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from myapp import tasks
+
+
+class Command(BaseCommand):
+    help = "Process background tasks from the database queue (run one or more of these next to the web server)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when no task is runnable")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--kind', action='append', dest='kinds', help="Only these task kinds (repeatable)")
+        parser.add_argument('--purge-days', type=int, default=7, help="Delete finished tasks older than this on start")
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        purged = tasks.purge(options['purge_days'])
+        self.stdout.write(f"Task worker {worker_id} started ({purged} old tasks purged)")
+
+        try:
+            while True:
+                close_old_connections()
+                task = tasks.claim(worker_id, options['kinds'])
+                if task is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                started = time.monotonic()
+                ok = tasks.run(task)
+                elapsed = time.monotonic() - started
+                if ok:
+                    self.stdout.write(f"{task} done in {elapsed:.1f}s")
+                else:
+                    self.stdout.write(self.style.WARNING(
+                        f"{task} attempt {task.attempts}/{task.max_attempts} failed in {elapsed:.1f}s: "
+                        f"{(task.last_error or '').strip().splitlines()[-1:]}"
+                    ))
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping; a task interrupted mid-run is retried once its lock expires.")
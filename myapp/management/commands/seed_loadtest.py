@@ -0,0 +1,150 @@
+import io
+import json
+import random
+import zipfile
+import requests
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from myapp.models import AIStudentAnswer, AITestSubmission, Course, StudentCourseEnrollment, TestSourceDocument
+
+
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+TOPICS = [
+    "photosynthesis", "cell respiration", "plate tectonics", "the water cycle", "supply and demand",
+    "the French Revolution", "Newton's laws", "chemical bonding", "ecosystems", "probability",
+]
+FACTS = [
+    "{topic} is studied through careful observation and measurement.",
+    "Early work on {topic} relied on simple experiments that are still taught today.",
+    "A common misconception about {topic} is that it happens all at once.",
+    "{topic} connects to several other units in this course.",
+    "Examples of {topic} can be found in everyday life.",
+    "Scientists describe {topic} with models that make testable predictions.",
+    "Understanding {topic} requires both definitions and worked examples.",
+]
+
+
+def make_docx(paragraphs):
+    """Build a minimal .docx in memory (enough for python-docx to read)."""
+    body = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{p.replace("&", "&amp;").replace("<", "&lt;")}</w:t></w:r></w:p>'
+        for p in paragraphs
+    )
+    files = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'
+        ),
+        "word/document.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        ),
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def synthetic_document(rng, topic, paragraphs=12):
+    lines = [topic.title()]
+    for _ in range(paragraphs):
+        lines.append(" ".join(rng.choice(FACTS).format(topic=topic).capitalize() for _ in range(4)))
+    return lines
+
+
+class Command(BaseCommand):
+    help = "Seed synthetic courses, users and AI tests for the load-test harness (loadtest/)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=5)
+        parser.add_argument('--students-per-course', type=int, default=100)
+        parser.add_argument('--tests-per-course', type=int, default=2)
+        parser.add_argument('--prefix', default='lt', help="Username / title prefix of seeded rows")
+        parser.add_argument('--password', default='loadtest-pass')
+        parser.add_argument('--llmapi', default='http://127.0.0.1:8001')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='loadtest-manifest.json')
+        parser.add_argument('--clear-submissions', action='store_true',
+                            help="Delete earlier AI test submissions of the seeded students so scenarios can rerun")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        rng = random.Random(options['seed'])
+        teacher_group, _ = Group.objects.get_or_create(name='Teacher')
+        student_group, _ = Group.objects.get_or_create(name='Student')
+
+        # Hash once: thousands of set_password calls would dominate seeding time
+        password = make_password(options['password'])
+
+        def user(username, group):
+            account, created = User.objects.get_or_create(username=username, defaults={'password': password})
+            if created:
+                account.groups.add(group)
+            return account
+
+        manifest = {"password": options['password'], "teachers": [], "students": [], "tests": []}
+
+        for c in range(options['courses']):
+            course, _ = Course.objects.get_or_create(name=f"{prefix} course {c}")
+            teacher = user(f"{prefix}_teacher_{c}", teacher_group)
+            course.teachers.add(teacher)
+            manifest["teachers"].append(teacher.username)
+
+            qna_ids = []
+            for t in range(options['tests_per_course']):
+                title = f"{prefix} test {c}.{t}"
+                doc = TestSourceDocument.objects.filter(course=course, title=title).exclude(qna_id=None).first()
+                if doc is None:
+                    topic = TOPICS[(c * options['tests_per_course'] + t) % len(TOPICS)]
+                    contents = make_docx(synthetic_document(rng, f"{topic} ({title})"))
+                    try:
+                        response = requests.post(
+                            f"{options['llmapi']}/generate-questions/",
+                            files={'file': (f"{title}.docx", contents, DOCX_MIME)},
+                            timeout=300,
+                        )
+                    except requests.RequestException as e:
+                        raise CommandError(f"llmapi unreachable at {options['llmapi']}: {e}")
+                    if response.status_code != 200 or not response.json().get("saved_id"):
+                        raise CommandError(f"Generation failed for {title}: {response.status_code} {response.text[:200]}")
+                    doc = TestSourceDocument(teacher=teacher, course=course, title=title,
+                                             qna_id=response.json()["saved_id"])
+                    doc.uploaded_file.save(f"{prefix}_{c}_{t}.docx", ContentFile(contents), save=False)
+                    doc.save()
+                qna_ids.append(doc.qna_id)
+                manifest["tests"].append({"doc_id": doc.id, "qna_id": doc.qna_id, "teacher": teacher.username})
+
+            for s in range(options['students_per_course']):
+                student = user(f"{prefix}_student_{c}_{s}", student_group)
+                StudentCourseEnrollment.objects.get_or_create(student=student, course=course)
+                manifest["students"].append({"username": student.username, "qna_ids": qna_ids})
+
+        if options['clear_submissions']:
+            usernames = [s["username"] for s in manifest["students"]]
+            AITestSubmission.objects.filter(student__username__in=usernames).delete()
+            AIStudentAnswer.objects.filter(student__username__in=usernames).delete()
+
+        with open(options['output'], 'w') as f:
+            json.dump(manifest, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(manifest['teachers'])} courses, {len(manifest['students'])} students and "
+            f"{len(manifest['tests'])} AI tests; manifest written to {options['output']}"
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from myapp.models import AIQuestionSet, TestSourceDocument
+from myapp.question_mirror import import_question_sets
+
+
+class Command(BaseCommand):
+    help = "Import generated question sets from llmapi into the local AIQuestion tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--qna-id', type=int, action='append', dest='qna_ids',
+                            help="Only these sets (repeatable); default is every set linked to a test document")
+        parser.add_argument('--refresh', action='store_true',
+                            help="Re-import sets that are already mirrored")
+
+    def handle(self, *args, **options):
+        qna_ids = options['qna_ids'] or list(
+            TestSourceDocument.objects.exclude(qna_id__isnull=True).values_list('qna_id', flat=True).distinct()
+        )
+        imported = import_question_sets(qna_ids, refresh=options['refresh'])
+
+        missing = set(qna_ids) - set(AIQuestionSet.objects.filter(qna_id__in=qna_ids).values_list('qna_id', flat=True))
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(imported)} of {len(set(qna_ids))} question sets."))
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f"Not available from llmapi: {', '.join(str(i) for i in sorted(missing))}"
+            ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0020_aistudentanswer_feedback_aistudentanswer_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsourcedocument',
+            name='generation_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='testsourcedocument',
+            name='generation_job_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
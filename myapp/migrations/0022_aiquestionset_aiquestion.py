@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0021_testsourcedocument_generation_error_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIQuestionSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('qna_id', models.IntegerField(unique=True)),
+                ('imported_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AIQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('question_type', models.CharField(max_length=10)),
+                ('question_text', models.TextField()),
+                ('choice_a', models.TextField(blank=True, null=True)),
+                ('choice_b', models.TextField(blank=True, null=True)),
+                ('choice_c', models.TextField(blank=True, null=True)),
+                ('choice_d', models.TextField(blank=True, null=True)),
+                ('correct_option', models.CharField(blank=True, max_length=1, null=True)),
+                ('answer', models.TextField(blank=True, null=True)),
+                ('question_set', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='myapp.aiquestionset')),
+            ],
+            options={
+                'ordering': ['position'],
+                'unique_together': {('question_set', 'position')},
+            },
+        ),
+    ]
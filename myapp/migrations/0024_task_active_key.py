@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+def set_active_keys(apps, schema_editor):
+    # One active task per key; any older duplicates keep active_key NULL
+    Task = apps.get_model('myapp', 'Task')
+    seen = set()
+    active = Task.objects.filter(status__in=('queued', 'running'), dedupe_key__isnull=False)
+    for task in active.order_by('id'):
+        if task.dedupe_key in seen:
+            continue
+        seen.add(task.dedupe_key)
+        Task.objects.filter(id=task.id).update(active_key=task.dedupe_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0023_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='active_key',
+            field=models.CharField(blank=True, max_length=200, null=True, unique=True),
+        ),
+        migrations.RunPython(set_active_keys, migrations.RunPython.noop),
+    ]
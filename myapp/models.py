@@ -73,6 +73,8 @@ class TestSourceDocument(models.Model):
     uploaded_file = models.FileField(upload_to='test_docs/')
     uploaded_at = models.DateTimeField(auto_now_add=True)
     qna_id = models.IntegerField(null=True, blank=True) 
+    generation_job_id = models.CharField(max_length=64, null=True, blank=True)
+    generation_error = models.TextField(null=True, blank=True)
     def __str__(self):
         return f"{self.title} ({self.course.name})"
 class AITestSubmission(models.Model):
@@ -104,3 +106,79 @@ class AIStudentAnswer(models.Model):
 
     def __str__(self):
         return f"{self.student.username} - QnA {self.qna_id} - {self.question_text[:30]}"
+
+
+class AIQuestionSet(models.Model):
+    """Local copy of one llmapi question set, so exams don't depend on llmapi."""
+    qna_id = models.IntegerField(unique=True)
+    imported_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"QnA {self.qna_id} ({self.questions.count()} questions)"
+
+class AIQuestion(models.Model):
+    question_set = models.ForeignKey(AIQuestionSet, on_delete=models.CASCADE, related_name='questions')
+    position = models.PositiveIntegerField()
+    question_type = models.CharField(max_length=10)  # 'mcq' or 'short'
+    question_text = models.TextField()
+    choice_a = models.TextField(null=True, blank=True)
+    choice_b = models.TextField(null=True, blank=True)
+    choice_c = models.TextField(null=True, blank=True)
+    choice_d = models.TextField(null=True, blank=True)
+    correct_option = models.CharField(max_length=1, null=True, blank=True)
+    answer = models.TextField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['position']
+        unique_together = ('question_set', 'position')
+
+    def as_dict(self):
+        """Same shape as llmapi's GET /questions/{qna_id} items."""
+        return {
+            "id": self.id,
+            "type": self.question_type,
+            "question": self.question_text,
+            "choices": {
+                "a": self.choice_a, "b": self.choice_b, "c": self.choice_c, "d": self.choice_d,
+            } if self.question_type == "mcq" else None,
+            "correct_option": self.correct_option,
+            "answer": self.answer,
+        }
+
+    def __str__(self):
+        return f"QnA {self.question_set.qna_id} #{self.position}: {self.question_text[:30]}"
+
+
+class Task(models.Model):
+    """One unit of background work for `manage.py run_task_worker` (see myapp/tasks.py)."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    # Only one queued/running task per key (e.g. one grading task per submission)
+    dedupe_key = models.CharField(max_length=200, null=True, blank=True, db_index=True)
+    # dedupe_key while queued/running, NULL once finished: the unique index lets
+    # the database itself refuse a second active task for the same key
+    active_key = models.CharField(max_length=200, null=True, blank=True, unique=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    timeout_seconds = models.PositiveIntegerField(default=300)
+    run_after = models.DateTimeField()
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
@@ -0,0 +1,91 @@
+"""Local mirror of llmapi question sets (AIQuestionSet / AIQuestion).
+
+Question sets never change once generated, so each one is imported the
+first time it is needed (or by ``manage.py sync_ai_questions``) and every
+later read is a local indexed query.
+"""
+import requests
+from django.db import IntegrityError, transaction
+from . import llmapi_client
+from .models import AIQuestion, AIQuestionSet
+
+# ids per GET /questions?ids=... (about 4 KB of query string at most)
+IMPORT_BATCH_SIZE = 500
+
+
+def _store(qna_id, questions):
+    with transaction.atomic():
+        question_set, _ = AIQuestionSet.objects.get_or_create(qna_id=qna_id)
+        question_set.questions.all().delete()
+        AIQuestion.objects.bulk_create([
+            AIQuestion(
+                question_set=question_set,
+                position=position,
+                question_type=q.get("type") or "",
+                question_text=q.get("question") or "",
+                choice_a=(q.get("choices") or {}).get("a"),
+                choice_b=(q.get("choices") or {}).get("b"),
+                choice_c=(q.get("choices") or {}).get("c"),
+                choice_d=(q.get("choices") or {}).get("d"),
+                correct_option=q.get("correct_option"),
+                answer=q.get("answer") or q.get("answer_text"),
+            )
+            for position, q in enumerate(questions)
+        ])
+        question_set.save()  # bump imported_at
+
+
+def import_question_sets(qna_ids, refresh=False):
+    """Copy the given sets from llmapi; returns the qna_ids that were imported.
+
+    Sets already mirrored are skipped unless ``refresh``. Ids llmapi does not
+    know (empty list) are left out so they are retried next time.
+    """
+    qna_ids = sorted({int(qna_id) for qna_id in qna_ids if qna_id is not None})
+    if not refresh:
+        existing = set(AIQuestionSet.objects.filter(qna_id__in=qna_ids).values_list('qna_id', flat=True))
+        qna_ids = [qna_id for qna_id in qna_ids if qna_id not in existing]
+
+    imported = []
+    for start in range(0, len(qna_ids), IMPORT_BATCH_SIZE):
+        chunk = qna_ids[start:start + IMPORT_BATCH_SIZE]
+        try:
+            # GET, not POST /questions/batch: it is read-only, so llmapi_client retries it
+            res = llmapi_client.get("/questions", "questions", params={"ids": ",".join(map(str, chunk))})
+        except requests.RequestException as e:
+            print(f"Error importing question sets: {e}")
+            continue
+        if res.status_code != 200:
+            continue
+        for qna_id, questions in res.json().items():
+            if not questions:
+                continue
+            try:
+                _store(int(qna_id), questions)
+            except IntegrityError:
+                pass  # a concurrent request imported the same set first
+            imported.append(int(qna_id))
+    return imported
+
+
+def get_questions(qna_id):
+    """Questions of one set in llmapi's shape, importing it on first use.
+
+    Returns None when the set is neither mirrored nor available from llmapi.
+    """
+    question_set = AIQuestionSet.objects.filter(qna_id=qna_id).first()
+    if question_set is None:
+        if not import_question_sets([qna_id]):
+            return None
+        question_set = AIQuestionSet.objects.get(qna_id=qna_id)
+    return [q.as_dict() for q in question_set.questions.all()]
+
+
+def get_question_sets(qna_ids):
+    """{qna_id: [questions]} for many sets in two queries, importing missing ones first."""
+    import_question_sets(qna_ids)
+    sets = {qna_id: [] for qna_id in qna_ids}
+    questions = AIQuestion.objects.filter(question_set__qna_id__in=qna_ids).select_related('question_set')
+    for q in questions.order_by('question_set_id', 'position'):
+        sets[q.question_set.qna_id].append(q.as_dict())
+    return sets
@@ -0,0 +1,234 @@
+"""Database-backed background tasks (no broker needed).
+
+Views ``enqueue`` work and return immediately; ``manage.py run_task_worker``
+processes start claiming queued tasks. A claim sets ``locked_until`` (the
+visibility timeout): if a worker dies mid-task the lock expires and another
+worker picks the task up again. Failed tasks are retried with exponential
+backoff until ``max_attempts`` is reached.
+"""
+import time
+import traceback
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .generation import refresh_generation_jobs, start_generation
+from .grading import grade_answers
+from .models import AIStudentAnswer, Task, TestSourceDocument
+
+HANDLERS = {}
+
+RETRY_BASE_SECONDS = 10
+GENERATION_POLL_SECONDS = 5
+GENERATION_TIMEOUT_SECONDS = 1800
+
+
+def task(kind, timeout=300, max_attempts=3):
+    """Register ``func(payload) -> result`` as the handler for ``kind``.
+
+    ``timeout`` is the visibility timeout: the task must finish within it
+    or it is handed to another worker.
+    """
+    def register(func):
+        HANDLERS[kind] = (func, timeout, max_attempts)
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, dedupe_key=None, delay=0):
+    """Queue a task; with ``dedupe_key`` an already queued/running task is reused.
+
+    The unique ``active_key`` column settles races: if a concurrent request
+    inserted the same key first, its task is returned instead.
+    """
+    _, timeout, max_attempts = HANDLERS[kind]
+    for _ in range(3):
+        if dedupe_key:
+            existing = Task.objects.filter(active_key=dedupe_key).first()
+            if existing is not None:
+                return existing
+        try:
+            with transaction.atomic():
+                return Task.objects.create(
+                    kind=kind,
+                    payload=payload or {},
+                    dedupe_key=dedupe_key,
+                    active_key=dedupe_key,
+                    timeout_seconds=timeout,
+                    max_attempts=max_attempts,
+                    run_after=timezone.now() + timedelta(seconds=delay),
+                )
+        except IntegrityError:
+            continue  # lost the race; the winner's task is found on the next pass
+    raise RuntimeError(f"Could not enqueue {kind} task for {dedupe_key!r}")
+
+
+def is_pending(dedupe_key):
+    return Task.objects.filter(active_key=dedupe_key).exists()
+
+
+def latest(dedupe_key):
+    """The most recent task queued under ``dedupe_key`` (any status), or None."""
+    return Task.objects.filter(dedupe_key=dedupe_key).order_by('-id').first()
+
+
+def pending_keys(dedupe_keys):
+    """The subset of ``dedupe_keys`` with a queued or running task, in one query."""
+    return set(
+        Task.objects.filter(active_key__in=list(dedupe_keys))
+        .values_list('active_key', flat=True)
+    )
+
+
+def _claimable(now):
+    # A running task whose lock expired lost its worker; it gets another go only if attempts remain
+    expired = Q(status='running', locked_until__lt=now, attempts__lt=F('max_attempts'))
+    return Task.objects.filter(Q(status='queued', run_after__lte=now) | expired)
+
+
+def fail_exhausted(now=None):
+    """Mark tasks whose lock expired on their last attempt as failed; returns how many."""
+    now = now or timezone.now()
+    return Task.objects.filter(
+        status='running', locked_until__lt=now, attempts__gte=F('max_attempts'),
+    ).update(
+        status='failed',
+        active_key=None,
+        locked_until=None,
+        finished_at=now,
+        last_error="Worker did not finish the task within its timeout on the last attempt.",
+    )
+
+
+def claim(worker_id, kinds=None):
+    """Atomically take the next runnable task for ``worker_id`` (or None).
+
+    The conditional UPDATE only succeeds for one worker per task, which
+    works the same on SQLite and MySQL without row locks.
+    """
+    now = timezone.now()
+    fail_exhausted(now)
+    candidates = _claimable(now)
+    if kinds:
+        candidates = candidates.filter(kind__in=kinds)
+    for candidate in candidates.order_by('run_after', 'id').values('id', 'timeout_seconds')[:10]:
+        claimed = _claimable(now).filter(id=candidate['id']).update(
+            status='running',
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=candidate['timeout_seconds']),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(id=candidate['id'])
+    return None
+
+
+def run(task_obj):
+    """Run a claimed task and record its outcome."""
+    handler = HANDLERS.get(task_obj.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for task kind {task_obj.kind!r}")
+        result = handler[0](task_obj.payload)
+    except Exception:
+        task_obj.last_error = traceback.format_exc()[-4000:]
+        task_obj.locked_until = None
+        if handler is not None and task_obj.attempts < task_obj.max_attempts:
+            task_obj.status = 'queued'
+            task_obj.run_after = timezone.now() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (task_obj.attempts - 1))
+        else:
+            task_obj.status = 'failed'
+            task_obj.active_key = None
+            task_obj.finished_at = timezone.now()
+        task_obj.save()
+        return False
+
+    task_obj.status = 'done'
+    task_obj.active_key = None
+    task_obj.result = result
+    task_obj.locked_until = None
+    task_obj.finished_at = timezone.now()
+    task_obj.save()
+    return True
+
+
+def purge(older_than_days=7):
+    """Delete finished tasks older than ``older_than_days``."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted, _ = Task.objects.filter(status__in=('done', 'failed'), finished_at__lt=cutoff).delete()
+    return deleted
+
+
+# ---------------------------------------------------------
+# TASK HANDLERS
+# ---------------------------------------------------------
+
+def grading_key(student_id, qna_id):
+    return f"grade:{student_id}:{qna_id}"
+
+
+def generation_key(doc_id):
+    return f"generate:{doc_id}"
+
+
+@task("grade_submission", timeout=600)
+def grade_submission(payload):
+    """Grade one student's descriptive answers for one AI test."""
+    answers = list(AIStudentAnswer.objects.filter(
+        student_id=payload["student_id"], qna_id=payload["qna_id"],
+        descriptive_answer__isnull=False, score__isnull=True,
+    ).exclude(descriptive_answer__exact=''))
+    graded, failed, skipped = grade_answers(answers, priority="interactive")
+    if failed:
+        # Raising keeps the task alive: the next attempt retries the answers llmapi could not grade
+        raise RuntimeError(f"{failed} answer(s) could not be graded")
+    return {"graded": graded, "skipped": skipped}
+
+
+@task("grade_pending", timeout=3600, max_attempts=1)
+def grade_pending(payload):
+    """Bulk-grade every unscored answer (same as the management command)."""
+    call_command('grade_descriptive_answers', workers=payload.get("workers", 4))
+    return {}
+
+
+@task("generate_test", timeout=300)
+def generate_test(payload):
+    """Send a document to llmapi; a poll_generation chain picks up the finished job."""
+    doc = TestSourceDocument.objects.filter(id=payload["doc_id"]).first()
+    if doc is None:
+        return {"status": "deleted"}
+    status = start_generation(doc, force=payload.get("force", False))
+    if status == "failed":
+        doc.generation_error = "Test generation failed."
+        doc.save()
+        raise RuntimeError("llmapi rejected the generation request")
+    if status == "queued":
+        # Polling happens in short follow-up tasks, so grading queued behind us isn't held up
+        enqueue("poll_generation", {
+            "doc_id": doc.id,
+            "job_id": doc.generation_job_id,
+            "deadline": time.time() + GENERATION_TIMEOUT_SECONDS,
+        }, delay=GENERATION_POLL_SECONDS)
+    return {"status": status, "qna_id": doc.qna_id, "job_id": doc.generation_job_id}
+
+
+@task("poll_generation", timeout=60)
+def poll_generation(payload):
+    """Check one llmapi generation job; queue the next check while it is still running."""
+    docs = TestSourceDocument.objects.filter(id=payload["doc_id"])
+    refresh_generation_jobs(docs)
+    doc = docs.first()
+    if doc is None:
+        return {"status": "deleted"}
+    if doc.generation_job_id != payload["job_id"]:
+        # Finished, or a newer regenerate replaced this job
+        return {"status": "failed" if doc.generation_error else "done", "qna_id": doc.qna_id}
+    if time.time() > payload["deadline"]:
+        doc.generation_job_id = None
+        doc.generation_error = "Test generation timed out, please regenerate."
+        doc.save()
+        return {"status": "timed out"}
+    enqueue("poll_generation", payload, delay=GENERATION_POLL_SECONDS)
+    return {"status": "queued"}
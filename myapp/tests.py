@@ -0,0 +1,95 @@
+from datetime import timedelta
+from unittest import mock
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+from . import tasks
+from .models import Task
+
+calls = []
+
+
+@tasks.task("test_record", timeout=30, max_attempts=2)
+def record(payload):
+    calls.append(payload)
+    if payload.get("fail"):
+        raise RuntimeError("boom")
+    return {"ok": True}
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def expire_lock(self, task, attempts):
+        past = timezone.now() - timedelta(seconds=1)
+        Task.objects.filter(id=task.id).update(
+            status='running', locked_by='dead:1', locked_until=past, attempts=attempts,
+        )
+
+    def test_claim_and_run(self):
+        queued = tasks.enqueue("test_record", {"n": 1})
+        claimed = tasks.claim("w1")
+        self.assertEqual((claimed.id, claimed.status, claimed.attempts), (queued.id, 'running', 1))
+        self.assertIsNone(tasks.claim("w2"))  # the lock keeps it from other workers
+
+        self.assertTrue(tasks.run(claimed))
+        claimed.refresh_from_db()
+        self.assertEqual((claimed.status, claimed.result), ('done', {"ok": True}))
+        self.assertEqual(calls, [{"n": 1}])
+
+    def test_dedupe_reuses_active_task(self):
+        first = tasks.enqueue("test_record", {}, dedupe_key="k")
+        self.assertEqual(tasks.enqueue("test_record", {}, dedupe_key="k").id, first.id)
+        tasks.run(tasks.claim("w1"))
+        self.assertNotEqual(tasks.enqueue("test_record", {}, dedupe_key="k").id, first.id)
+
+    def test_only_one_active_task_per_key(self):
+        first = tasks.enqueue("test_record", {}, dedupe_key="k")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.create(kind="test_record", run_after=timezone.now(), dedupe_key="k", active_key="k")
+
+        # A concurrent request that missed the lookup gets the winner's task back
+        winner = Task.objects.filter(active_key="k")
+        with mock.patch.object(Task.objects, "filter", side_effect=[Task.objects.none(), winner]):
+            self.assertEqual(tasks.enqueue("test_record", {}, dedupe_key="k").id, first.id)
+        self.assertEqual(Task.objects.filter(dedupe_key="k").count(), 1)
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        tasks.enqueue("test_record", {"fail": True})
+        task = tasks.claim("w1")
+        self.assertFalse(tasks.run(task))
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'queued')
+        self.assertGreater(task.run_after, timezone.now() + timedelta(seconds=tasks.RETRY_BASE_SECONDS - 1))
+        self.assertIsNone(tasks.claim("w1"))  # not before run_after
+
+        Task.objects.filter(id=task.id).update(run_after=timezone.now())
+        task = tasks.claim("w1")
+        self.assertFalse(tasks.run(task))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', 2))
+        self.assertIn("boom", task.last_error)
+
+    def test_expired_lock_is_reclaimed(self):
+        task = tasks.enqueue("test_record", {})
+        self.expire_lock(task, attempts=1)
+
+        claimed = tasks.claim("w2")
+        self.assertEqual((claimed.id, claimed.locked_by, claimed.attempts), (task.id, "w2", 2))
+
+    def test_expired_lock_on_last_attempt_fails_the_task(self):
+        task = tasks.enqueue("test_record", {})
+        self.expire_lock(task, attempts=task.max_attempts)
+
+        self.assertIsNone(tasks.claim("w2"))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', task.max_attempts))
+        self.assertIsNotNone(task.finished_at)
+        self.assertEqual(calls, [])
+
+    def test_unknown_kind_fails_without_retry(self):
+        task = Task.objects.create(kind="nope", run_after=timezone.now())
+        self.assertFalse(tasks.run(tasks.claim("w1")))
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'failed')
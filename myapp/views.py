@@ -9,6 +9,9 @@ from .models import Test
 from .forms import TestSourceDocumentForm
 from .models import AITestSubmission, TestSourceDocument
 from .models import AIStudentAnswer 
+from . import question_mirror, tasks
+from .grading import ungraded_answers
+from .generation import refresh_generation_jobs
 
 def home(request):
     return render(request, 'myapp/login.html')
@@ -282,21 +285,28 @@ def teacher_dashboard(request):
                 test_doc.teacher = request.user
                 test_doc.save()
 
-                try:
-                    with open(test_doc.uploaded_file.path, "rb") as f:
-                        res = requests.post("http://127.0.0.1:8001/generate-questions/", files={"file": f})
-                    if res.status_code == 200:
-                        test_doc.qna_id = res.json().get("saved_id")
-                        test_doc.save()
-                        messages.success(request, "Document uploaded & test generated!")
-                    else:
-                        messages.warning(request, "Uploaded, but test generation failed.")
-                except Exception as e:
-                    messages.error(request, f"Error sending to LLM: {e}")
+                # Generation runs in the task worker (`manage.py run_task_worker`)
+                tasks.enqueue("generate_test", {"doc_id": test_doc.id}, dedupe_key=tasks.generation_key(test_doc.id))
+                messages.success(request, "Document uploaded! The test is being generated.")
             else:
                 messages.error(request, "Form is invalid.")
             return redirect('teacher_dashboard')
 
+        # 7b. Regenerate the test of an uploaded .docx (explicit, runs as a background task)
+        elif 'regenerate_test_doc' in request.POST:
+            doc_id = request.POST.get('doc_id')
+            try:
+                doc = TestSourceDocument.objects.get(id=doc_id, teacher=request.user)
+                key = tasks.generation_key(doc.id)
+                if doc.generation_job_id or tasks.is_pending(key):
+                    messages.warning(request, "This test is already being generated.")
+                else:
+                    tasks.enqueue("generate_test", {"doc_id": doc.id, "force": True}, dedupe_key=key)
+                    messages.success(request, f"Regenerating the test for {doc.title}.")
+            except TestSourceDocument.DoesNotExist:
+                messages.error(request, "Document not found or unauthorized.")
+            return redirect('teacher_dashboard')
+
         # 8. Delete uploaded .docx Test Source
         elif 'delete_test_doc' in request.POST:
             doc_id = request.POST.get('doc_id')
@@ -328,6 +338,10 @@ def teacher_dashboard(request):
     # 10. Fetch MCQ Tests
     tests = Test.objects.filter(course__teachers=request.user)
 
+    # 11. Documents with generation still queued (finished jobs are picked up by poll_generation tasks)
+    keys = {tasks.generation_key(doc.id): doc.id for doc in test_docs}
+    generating_ids = {keys[key] for key in tasks.pending_keys(keys)}
+
     return render(request, 'myapp/teacher_dashboard.html', {
         'teacher_courses': teacher_courses,
         'assignments': assignments,
@@ -335,7 +349,8 @@ def teacher_dashboard(request):
         'students': students,
         'tests': tests,
         'doc_form': doc_form,
-        'test_docs': test_docs
+        'test_docs': test_docs,
+        'generating_ids': generating_ids,
     })
 
 @login_required
@@ -496,7 +511,6 @@ def admin_dashboard(request):
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-import requests
 
 @login_required
 def view_generated_test(request, doc_id):
@@ -505,52 +519,28 @@ def view_generated_test(request, doc_id):
 
     doc = get_object_or_404(TestSourceDocument, id=doc_id, teacher=request.user)
 
-    try:
-        # Send .docx file to FastAPI to generate questions
-        with open(doc.uploaded_file.path, 'rb') as f:
-            response = requests.post(
-                'http://127.0.0.1:8001/generate-questions/',
-                files={'file': (doc.uploaded_file.name, f, 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')}
-            )
-
-        if response.status_code != 200:
-            messages.error(request, "LLM API error.")
-            return redirect('teacher_dashboard')
-
-        result = response.json()
-        qna_id = result.get("saved_id")
-
-        # ✅ Save qna_id to the TestSourceDocument instance
-        doc.qna_id = qna_id
-        doc.save()
-
-        # Get questions from FastAPI by qna_id
-        q_response = requests.get(f"http://127.0.0.1:8001/questions/{qna_id}")
-        if q_response.status_code != 200:
-            messages.error(request, "Failed to fetch questions.")
-            return redirect('teacher_dashboard')
-
-        questions = q_response.json()
-        mcqs = [q for q in questions if q["type"] == "mcq"]
-        long_answers = [q for q in questions if q["type"] == "short"]
-
-        # Fix key mismatch: map 'answer_text' to 'answer' so template works
-        '''for q in long_answers:
-            q["answer"] = q.pop("answer_text", "")'''
-        for q in long_answers:
-            if "answer" not in q:
-             q["answer"] = q.pop("answer_text", "")
-
-        return render(request, 'myapp/view_generated_test.html', {
-            'doc': doc,
-            'mcqs': mcqs,
-            'long_answers': long_answers
-        })
+    # Read-only: shows the stored set, (re)generation is the dashboard's regenerate action
+    if doc.qna_id is None:
+        refresh_generation_jobs(TestSourceDocument.objects.filter(id=doc.id))
+        doc.refresh_from_db()
+    if doc.qna_id is None:
+        if doc.generation_job_id or tasks.is_pending(tasks.generation_key(doc.id)):
+            messages.info(request, "The test is still being generated. Please check back shortly.")
+        else:
+            messages.warning(request, "No test has been generated for this document yet.")
+        return redirect('teacher_dashboard')
 
-    except Exception as e:
-        messages.error(request, f"Error: {str(e)}")
+    questions = question_mirror.get_questions(doc.qna_id)
+    if questions is None:
+        messages.error(request, "Failed to fetch questions.")
         return redirect('teacher_dashboard')
 
+    return render(request, 'myapp/view_generated_test.html', {
+        'doc': doc,
+        'mcqs': [q for q in questions if q["type"] == "mcq"],
+        'long_answers': [q for q in questions if q["type"] == "short"],
+    })
+
 @login_required
 def solve_ai_test(request, qna_id):
     if not request.user.groups.filter(name='Student').exists():
@@ -560,13 +550,12 @@ def solve_ai_test(request, qna_id):
         messages.warning(request, "You've already submitted this test.")
         return redirect('student_dashboard')
 
-    response = requests.get(f"http://127.0.0.1:8001/questions/{qna_id}")
-    if response.status_code != 200:
+    # Local mirror: only the first student to open a new test waits on llmapi
+    questions = question_mirror.get_questions(qna_id)
+    if questions is None:
         messages.error(request, "Failed to fetch test questions.")
         return redirect('student_dashboard')
 
-    questions = response.json()
-
     if request.method == 'POST':
         AITestSubmission.objects.create(student=request.user, qna_id=qna_id)
 
@@ -605,6 +594,13 @@ def solve_ai_test(request, qna_id):
                     )
                 else:
                     print(f"[DEBUG] Empty input for: {input_name}")
+
+        # Short answers are graded in the background; the result page shows them as in progress
+        if any(q.get("type") == "short" for q in questions):
+            tasks.enqueue(
+                "grade_submission", {"student_id": request.user.id, "qna_id": qna_id},
+                dedupe_key=tasks.grading_key(request.user.id, qna_id),
+            )
         messages.success(request, "Test submitted successfully!")
         return redirect('student_dashboard')
 
@@ -629,23 +625,16 @@ def view_ai_test_result(request, qna_id):
     mcqs = answers.filter(selected_option__isnull=False)
     descriptive = answers.exclude(descriptive_answer__isnull=True).exclude(descriptive_answer__exact='')
 
-    # Get expected answers for evaluation (for descriptive)
-    try:
-        res = requests.get(f"http://127.0.0.1:8001/questions/{qna_id}")
-        questions = res.json()
-        qna_map = {q['question']: q.get('answer', q.get('answer_text', '')) for q in questions if q['type'] == 'short'}
-    except:
-        qna_map = {}
-
-    # Evaluate descriptive answers (only if not already evaluated)
-    for ans in descriptive:
-        if ans.score is None and ans.feedback is None:
-            expected = qna_map.get(ans.question_text, "")
-            if expected:
-                score, feedback = evaluate_descriptive_answer(ans.question_text, expected, ans.descriptive_answer)
-                ans.score = score
-                ans.feedback = feedback
-                ans.save()
+    # Ungraded answers are handled by the task worker. A finished task means the rest have
+    # no sample answer to grade against; otherwise (none yet, or it failed) make sure one is queued.
+    key = tasks.grading_key(request.user.id, qna_id)
+    last_task = tasks.latest(key)
+    grading_in_progress = (
+        any(ans.score is None for ans in descriptive)
+        and (last_task is None or last_task.status != 'done')
+    )
+    if grading_in_progress:
+        tasks.enqueue("grade_submission", {"student_id": request.user.id, "qna_id": qna_id}, dedupe_key=key)
 
     # MCQ scoring
     mcq_score = sum(1 for ans in mcqs if ans.is_correct)
@@ -669,62 +658,27 @@ def view_ai_test_result(request, qna_id):
         'desc_total': desc_total,
         'overall_score': overall_score,
         'overall_total': overall_total,
+        'grading_in_progress': grading_in_progress,
     })
-    
-def evaluate_descriptive_answer(question, expected, student):
-    try:
-        res = requests.post(
-            "http://127.0.0.1:8001/evaluate-answer/",
-            json={"prompt": question, "expected": expected, "student": student}
-        )
-        if res.status_code == 200:
-            data = res.json()
-            return data.get("score", 0.0), data.get("feedback", "")
-        else:
-            return 0.0, "LLM Evaluation Failed"
-    except Exception as e:
-        return 0.0, f"Error: {str(e)}"
 
 from .models import AIStudentAnswer
-import requests
 from django.http import JsonResponse
+from django.views.decorators.http import require_POST
 
+@login_required
+@require_POST
 def run_descriptive_evaluation(request):
-    # Only fetch descriptive answers that haven't been scored yet
-    answers = AIStudentAnswer.objects.filter(
-        descriptive_answer__isnull=False,
-        score__isnull=True
-    )
-
-    for ans in answers:
-        qna_id = ans.qna_id
-        question_text = ans.question_text
-
-        try:
-            # Fetch model answer via FastAPI
-            q_response = requests.get(f"http://127.0.0.1:8001/questions/{qna_id}")
-            if q_response.status_code != 200:
-                continue
-
-            questions = q_response.json()
-            match = next((q for q in questions if q["type"] == "short" and q["question"] == question_text), None)
-            if not match:
-                continue
-
-            model_answer = match.get("answer") or match.get("answer_text", "")
-            student_answer = ans.descriptive_answer
-
-            # Evaluate using your existing function
-            score, feedback = evaluate_descriptive_answer(question_text, model_answer, student_answer)
-
-            # Save result
-            ans.score = score
-            ans.feedback = feedback
-            ans.save()
-
-        except Exception as e:
-            print(f"Error evaluating answer: {e}")
-            continue
-
-    return JsonResponse({"status": "Evaluation complete"})
-
+    # Grades every student's answers and spends LLM quota, so staff only
+    if not request.user.groups.filter(name__in=['Teacher', 'Admin']).exists():
+        return JsonResponse({"error": "Only teachers and admins can start grading."}, status=403)
+
+    # Bulk grading runs in the task worker (same as `python manage.py grade_descriptive_answers`)
+    answers = ungraded_answers()
+    pending = answers.count()
+    task = tasks.enqueue("grade_pending", dedupe_key="grade:all") if pending else None
+    return JsonResponse({
+        "status": task.status if task else "nothing to grade",
+        "task_id": task.id if task else None,
+        "pending": pending,
+        "tests": answers.values('qna_id').distinct().count(),
+    })